@@ -0,0 +1,49 @@
+"""
+Multi-worker launcher for the aai Saheb API.
+
+Runs N uvicorn worker processes on one socket so the API uses every core on
+the host instead of a single event loop. Workers share nothing in memory:
+rate limits, cache invalidations and startup maintenance are coordinated
+through MongoDB, and SECRET_KEY has to come from the environment (or
+backend/.env) so a token issued by one worker is accepted by the others:
+
+    SECRET_KEY=... python serve.py --workers 4
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+REQUIRED_KEYS = ("SECRET_KEY",)
+
+
+def missing_keys() -> list:
+    """Key material that would otherwise differ between workers"""
+    return [name for name in REQUIRED_KEYS if not os.getenv(name)]
+
+
+def main():
+    load_dotenv(ROOT_DIR / '.env')
+    parser = argparse.ArgumentParser(description="Run the aai Saheb API with several worker processes")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="worker processes (defaults to WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8001")))
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    missing = missing_keys()
+    if workers > 1 and missing:
+        print(f"Refusing to start {workers} workers without shared keys: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(2)
+
+    import uvicorn
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=workers, app_dir=str(ROOT_DIR))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime, timedelta
-from typing import List, Optional
+from pymongo import InsertOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 import os
 import logging
 import asyncio
+import importlib
+from abc import ABC, abstractmethod
 import json
+import csv
+import io
+import time
+import math
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 import jwt
-import bcrypt
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, ValidationError
 import uuid
+import base64
+import hmac
+import hashlib
+from collections import OrderedDict, deque
 import random
 import string
-import requests
-from geopy.distance import geodesic
-from cryptography.fernet import Fernet
+import re
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -28,11 +39,237 @@ load_dotenv(ROOT_DIR / '.env')
 SECRET_KEY = os.getenv('SECRET_KEY', 'aai-saheb-secret-key-2025')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24 * 7  # 7 days
+SOS_NOTIFY_CONCURRENCY = int(os.getenv('SOS_NOTIFY_CONCURRENCY', '10'))
+SOS_NOTIFY_TIMEOUT_SECONDS = float(os.getenv('SOS_NOTIFY_TIMEOUT_SECONDS', '15'))
+OTP_PROVIDER = os.getenv('OTP_PROVIDER', 'fake')
+OTP_FAKE_LATENCY_SECONDS = float(os.getenv('OTP_FAKE_LATENCY_SECONDS', '1'))
+OTP_DELIVERY_WORKERS = int(os.getenv('OTP_DELIVERY_WORKERS', '4'))
+OTP_QUEUE_MAX_SIZE = int(os.getenv('OTP_QUEUE_MAX_SIZE', '10000'))
+OTP_DELIVERY_TIMEOUT_SECONDS = float(os.getenv('OTP_DELIVERY_TIMEOUT_SECONDS', '30'))
+
+COUNTER_FLUSH_SECONDS = float(os.getenv('COUNTER_FLUSH_SECONDS', '2'))
+POLL_TALLY_SHARDS = int(os.getenv('POLL_TALLY_SHARDS', '16'))
+POLL_TALLY_CACHE_SECONDS = float(os.getenv('POLL_TALLY_CACHE_SECONDS', '2'))
+
+# Live SOS location streaming
+SOS_LOCATION_FLUSH_BATCH = int(os.getenv('SOS_LOCATION_FLUSH_BATCH', '500'))
+SOS_LOCATION_FLUSH_SECONDS = float(os.getenv('SOS_LOCATION_FLUSH_SECONDS', '1'))
+SOS_LOCATION_RETENTION_DAYS = int(os.getenv('SOS_LOCATION_RETENTION_DAYS', '90'))
+
+# SOS media uploads
+MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', str(ROOT_DIR / 'media')))
+MEDIA_UPLOAD_CHUNK_BYTES = int(os.getenv('MEDIA_UPLOAD_CHUNK_BYTES', str(1024 * 1024)))
+MEDIA_UPLOAD_MAX_CHUNK_BYTES = int(os.getenv('MEDIA_UPLOAD_MAX_CHUNK_BYTES', str(8 * 1024 * 1024)))
+MEDIA_UPLOAD_MAX_BYTES = int(os.getenv('MEDIA_UPLOAD_MAX_BYTES', str(500 * 1024 * 1024)))
+MEDIA_UPLOAD_LEASE_SECONDS = int(os.getenv('MEDIA_UPLOAD_LEASE_SECONDS', '120'))
+# Unfinished sessions expire this long after their last chunk; their part files are swept
+MEDIA_UPLOAD_SESSION_TTL_SECONDS = int(os.getenv('MEDIA_UPLOAD_SESSION_TTL_SECONDS', str(24 * 3600)))
+MEDIA_UPLOAD_SWEEP_SECONDS = float(os.getenv('MEDIA_UPLOAD_SWEEP_SECONDS', '3600'))
+
+# Nearby responders
+RESPONDER_CELL_DEGREES = float(os.getenv('RESPONDER_CELL_DEGREES', '0.1'))
+RESPONDER_SEARCH_RADIUS_KM = float(os.getenv('RESPONDER_SEARCH_RADIUS_KM', '10'))
+RESPONDER_NEAREST_K = int(os.getenv('RESPONDER_NEAREST_K', '5'))
+RESPONDER_INDEX_REFRESH_SECONDS = float(os.getenv('RESPONDER_INDEX_REFRESH_SECONDS', '60'))
+
+JOBS_NEAR_DEFAULT_RADIUS_KM = float(os.getenv('JOBS_NEAR_DEFAULT_RADIUS_KM', '25'))
+JOBS_NEAR_MAX_RADIUS_KM = float(os.getenv('JOBS_NEAR_MAX_RADIUS_KM', '200'))
+JOB_SEARCH_FACET_LIMIT = int(os.getenv('JOB_SEARCH_FACET_LIMIT', '20'))
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_BYTES = int(os.getenv('EXPORT_CHUNK_BYTES', str(64 * 1024)))
+JOBS_IMPORT_BATCH_SIZE = int(os.getenv('JOBS_IMPORT_BATCH_SIZE', '500'))
+JOBS_IMPORT_MAX_LINE_BYTES = int(os.getenv('JOBS_IMPORT_MAX_LINE_BYTES', str(64 * 1024)))
+JOBS_IMPORT_MAX_ERRORS = int(os.getenv('JOBS_IMPORT_MAX_ERRORS', '1000'))
+
+USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '10000'))
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+FEED_CACHE_SIZE = int(os.getenv('FEED_CACHE_SIZE', '100'))
+FEED_CACHE_REFRESH_SECONDS = float(os.getenv('FEED_CACHE_REFRESH_SECONDS', '30'))
+
+# Multi-worker deployments (serve.py): state shared across API processes
+CACHE_SYNC_SECONDS = float(os.getenv('CACHE_SYNC_SECONDS', '1'))
+CACHE_SYNC_LOOKBACK_SECONDS = float(os.getenv('CACHE_SYNC_LOOKBACK_SECONDS', '5'))
+OTP_RATE_LIMIT = int(os.getenv('OTP_RATE_LIMIT', '5'))
+OTP_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv('OTP_RATE_LIMIT_WINDOW_SECONDS', '600'))
+DATABASE_MAINTENANCE_LEASE_SECONDS = int(os.getenv('DATABASE_MAINTENANCE_LEASE_SECONDS', '900'))
+
+# Admission control: in-flight caps per priority class (0 = uncapped)
+ADMISSION_STANDARD_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_STANDARD_MAX_IN_FLIGHT', '0'))
+ADMISSION_LOW_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_LOW_MAX_IN_FLIGHT', '32'))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', '0.25'))
+ADMISSION_MAX_LOOP_LAG_SECONDS = float(os.getenv('ADMISSION_MAX_LOOP_LAG_SECONDS', '0.1'))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '2'))
+
+# SOS outbox: each alert carries its delivery state and worker tasks claim it.
+# Set SOS_OUTBOX_EMBEDDED_WORKERS=0 when running dedicated `sos_worker.py` processes.
+SOS_OUTBOX_EMBEDDED_WORKERS = int(os.getenv('SOS_OUTBOX_EMBEDDED_WORKERS', '1'))
+SOS_OUTBOX_MAX_ATTEMPTS = int(os.getenv('SOS_OUTBOX_MAX_ATTEMPTS', '5'))
+SOS_OUTBOX_LEASE_SECONDS = int(os.getenv('SOS_OUTBOX_LEASE_SECONDS', '60'))
+SOS_OUTBOX_POLL_SECONDS = float(os.getenv('SOS_OUTBOX_POLL_SECONDS', '0.5'))
+SOS_OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv('SOS_OUTBOX_BACKOFF_BASE_SECONDS', '2'))
+SOS_OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv('SOS_OUTBOX_BACKOFF_MAX_SECONDS', '120'))
+
+# Metrics
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_SAMPLE_SECONDS = float(os.getenv('LOOP_LAG_SAMPLE_SECONDS', '0.5'))
+
+class Histogram:
+    """Cumulative-bucket latency histogram in seconds (Prometheus layout)"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+
+class MetricsRegistry:
+    """Request, Mongo command and event-loop metrics.
+
+    Mongo command events arrive on driver threads, so updates go through a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[tuple, int] = {}
+        self.request_latency: Dict[tuple, Histogram] = {}
+        self.mongo_latency: Dict[tuple, Histogram] = {}
+        self.mongo_failures: Dict[tuple, int] = {}
+        self.loop_lag = Histogram()
+        self.loop_lag_last = 0.0
+
+    def record_request(self, method: str, route: str, status: int, seconds: float):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_latency.setdefault((method, route), Histogram()).observe(seconds)
+
+    def record_mongo(self, collection: str, operation: str, seconds: float, failed: bool = False):
+        with self._lock:
+            key = (collection, operation)
+            self.mongo_latency.setdefault(key, Histogram()).observe(seconds)
+            if failed:
+                self.mongo_failures[key] = self.mongo_failures.get(key, 0) + 1
+
+    def record_loop_lag(self, seconds: float):
+        with self._lock:
+            self.loop_lag.observe(seconds)
+            self.loop_lag_last = seconds
+
+    @staticmethod
+    def _labels(names: tuple, values: tuple) -> str:
+        pairs = []
+        for name, value in zip(names, values):
+            escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{name}="{escaped}"')
+        return ",".join(pairs)
+
+    def _histogram_lines(self, metric: str, names: tuple, series: Dict[tuple, Histogram]) -> List[str]:
+        lines = [f"# TYPE {metric} histogram"]
+        for values, histogram in sorted(series.items()):
+            labels = self._labels(names, values)
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{metric}_sum{suffix} {histogram.total:.6f}")
+            lines.append(f"{metric}_count{suffix} {histogram.count}")
+        return lines
+
+    def render(self, gauges: Dict[str, float]) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            lines = ["# TYPE aai_http_requests_total counter"]
+            for values, count in sorted(self.requests.items()):
+                lines.append(f"aai_http_requests_total{{{self._labels(('method', 'route', 'status'), values)}}} {count}")
+            lines += self._histogram_lines(
+                "aai_http_request_duration_seconds", ("method", "route"), self.request_latency
+            )
+            lines += self._histogram_lines(
+                "aai_mongo_command_duration_seconds", ("collection", "operation"), self.mongo_latency
+            )
+            lines.append("# TYPE aai_mongo_command_failures_total counter")
+            for values, count in sorted(self.mongo_failures.items()):
+                lines.append(f"aai_mongo_command_failures_total{{{self._labels(('collection', 'operation'), values)}}} {count}")
+            lines += self._histogram_lines("aai_event_loop_lag_seconds", (), {(): self.loop_lag})
+            lines.append("# TYPE aai_event_loop_lag_last_seconds gauge")
+            lines.append(f"aai_event_loop_lag_last_seconds {self.loop_lag_last:.6f}")
+        for name, value in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every Mongo command by collection and operation"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._pending: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            # getMore carries the cursor id; the collection is a separate field
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "admin"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is not None:
+            self.registry.record_mongo(labels[0], labels[1], event.duration_micros / 1_000_000, failed)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+async def sample_event_loop_lag(stop_event: asyncio.Event):
+    """Measure how late the loop wakes a sleeping task"""
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_SAMPLE_SECONDS)
+        metrics.record_loop_lag(max(0.0, time.perf_counter() - started - LOOP_LAG_SAMPLE_SECONDS))
 
 # MongoDB connection
+# The client is created by connect_database() during startup, not at import
+# time, so importing this module stays cheap for scripts, tests and new workers.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def connect_database():
+    """Create the Motor client once; a db assigned beforehand (e.g. a stand-in) is kept"""
+    global client, db
+    if db is not None:
+        return db
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics(metrics)])
+    db = client[os.environ['DB_NAME']]
+    return db
+
+async def warm_database():
+    """Open a pooled connection before the first request needs one"""
+    if client is None:
+        return
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        logger.error(f"MongoDB warm-up ping failed: {str(e)}")
 
 # FastAPI app
 app = FastAPI(title="aai Saheb - Women Empowerment Platform", version="1.0.0")
@@ -41,6 +278,101 @@ api_router = APIRouter(prefix="/api")
 # Security
 security = HTTPBearer()
 
+# Admission control
+# Route prefixes by priority; anything unlisted is "standard"
+ADMISSION_PRIORITIES = {
+    "critical": ("/api/sos", "/api/auth", "/api/responders", "/api/health", "/api/metrics"),
+    "low": ("/api/community", "/api/jobs", "/api/screens", "/api/admin"),
+}
+
+class AdmissionController:
+    """Caps in-flight requests per priority class so SOS keeps its latency under load.
+
+    Critical routes (SOS, auth, health checks) are always admitted. Capped
+    classes wait up to queue_timeout for a free slot and are shed with 503 +
+    Retry-After otherwise. Low-priority requests are shed without queueing
+    while the event loop is lagging, since waiting would only grow the backlog.
+    """
+
+    def __init__(self, limits: Dict[str, int], queue_timeout: float, max_loop_lag: float):
+        self.limits = limits
+        self.queue_timeout = queue_timeout
+        self.max_loop_lag = max_loop_lag
+        self._slots = {priority: asyncio.Semaphore(limit) for priority, limit in limits.items() if limit > 0}
+        self.in_flight = {priority: 0 for priority in ("critical", "standard", "low")}
+        self.shed = {priority: 0 for priority in ("critical", "standard", "low")}
+
+    @staticmethod
+    def classify(path: str) -> str:
+        for priority, prefixes in ADMISSION_PRIORITIES.items():
+            if any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes):
+                return priority
+        return "standard"
+
+    def loop_saturated(self) -> bool:
+        return self.max_loop_lag > 0 and metrics.loop_lag_last > self.max_loop_lag
+
+    async def admit(self, priority: str) -> bool:
+        """Take a slot for the request, or return False to shed it"""
+        slots = self._slots.get(priority)
+        if slots is not None:
+            if priority == "low" and self.loop_saturated():
+                self.shed[priority] += 1
+                return False
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=max(self.queue_timeout, 0.001))
+            except asyncio.TimeoutError:
+                self.shed[priority] += 1
+                return False
+        self.in_flight[priority] += 1
+        return True
+
+    def release(self, priority: str):
+        self.in_flight[priority] -= 1
+        slots = self._slots.get(priority)
+        if slots is not None:
+            slots.release()
+
+    def stats(self) -> dict:
+        return {"in_flight": dict(self.in_flight), "shed": dict(self.shed)}
+
+admission = AdmissionController(
+    {"standard": ADMISSION_STANDARD_MAX_IN_FLIGHT, "low": ADMISSION_LOW_MAX_IN_FLIGHT},
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_MAX_LOOP_LAG_SECONDS
+)
+
+class AdmissionMiddleware:
+    """Pure ASGI so the slot is held until the response body has been sent.
+
+    call_next-style middleware returns as soon as the headers are ready, which
+    would let streaming exports run without holding a slot.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = admission.classify(scope["path"])
+        if not await admission.admit(priority):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(priority)
+
+# Registered before CORS so shed responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -50,13 +382,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class RequestMetricsMiddleware:
+    """Times each request until its last body chunk is sent, so streaming
+    responses count in full; pure ASGI for the same reason as AdmissionMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded
+            metrics.record_request(
+                scope["method"],
+                getattr(scope.get("route"), "path", "unmatched"),
+                status,
+                time.perf_counter() - started
+            )
+
+app.add_middleware(RequestMetricsMiddleware)
+
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Encryption key for sensitive data
-ENCRYPTION_KEY = Fernet.generate_key()
-cipher_suite = Fernet(ENCRYPTION_KEY)
+def json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+# Fast JSON responses for list endpoints: orjson serializes datetime natively
+# and skips FastAPI's jsonable_encoder pass when the response is returned directly.
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    class FastJSONResponse(JSONResponse):
+        def render(self, content) -> bytes:
+            return json.dumps(
+                content, ensure_ascii=False, separators=(",", ":"), default=json_default
+            ).encode("utf-8")
+
+# Fields rendered by list screens; `_id` is never sent
+SOS_ALERT_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "location": 1, "timestamp": 1, "status": 1, "is_stealth": 1,
+    "media_files": 1, "resolved_at": 1, "time_to_last_notification_ms": 1,
+    "contacts_notified.name": 1, "contacts_notified.status": 1
+}
+JOB_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "company": 1, "location": 1, "city": 1, "district": 1,
+    "description": 1, "requirements": 1, "salary_range": 1, "is_women_friendly": 1,
+    "latitude": 1, "longitude": 1, "created_at": 1, "application_deadline": 1
+}
+POST_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "content": 1, "media_files": 1, "tags": 1,
+    "likes_count": 1, "comments_count": 1, "is_anonymous": 1, "created_at": 1
+}
 
 # Pydantic Models
 class UserRegister(BaseModel):
@@ -76,6 +469,9 @@ class OTPVerify(BaseModel):
     email: Optional[EmailStr] = None
     otp: str
 
+# Roles that unlock partner, responder or admin routes; granted server-side only
+PRIVILEGED_ROLES = ("admin", "ngoPartner", "volunteer")
+
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -97,9 +493,21 @@ class SOSAlert(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     status: str = 'active'  # active, resolved, false_alarm
     media_files: List[str] = []
-    contacts_notified: List[str] = []
+    contacts_notified: List[dict] = []  # per-contact delivery outcome and latency
     is_stealth: bool = False
 
+class MediaUploadInit(BaseModel):
+    alert_id: str
+    filename: str
+    content_type: Optional[str] = None
+    total_size: int = Field(gt=0)
+    sha256: Optional[str] = None  # hex digest of the whole file, checked on completion
+
+class ResponderLocation(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    is_active: bool = True
+
 class TrustedContact(BaseModel):
     name: str
     phone: str
@@ -117,6 +525,28 @@ class JobPosting(BaseModel):
     is_women_friendly: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
     application_deadline: Optional[datetime] = None
+    city: Optional[str] = None
+    district: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    # Partner's own id for the listing; bulk imports upsert on it
+    external_id: Optional[str] = Field(default=None, min_length=1, max_length=200)
+
+class CommentCreate(BaseModel):
+    content: str = Field(min_length=1, max_length=2000)
+    is_anonymous: bool = False
+
+class PollOption(BaseModel):
+    text: str = Field(min_length=1, max_length=200)
+
+class PollCreate(BaseModel):
+    question: str = Field(min_length=1, max_length=500)
+    options: List[PollOption] = Field(min_length=2, max_length=10)
+    end_date: Optional[datetime] = None
+
+class PollVote(BaseModel):
+    model_config = {"populate_by_name": True}
+    option_index: int = Field(alias="optionIndex", ge=0)
 
 class CommunityPost(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -129,10 +559,404 @@ class CommunityPost(BaseModel):
     is_anonymous: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# User cache
+class UserCache:
+    """Bounded LRU cache of user documents with per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return dict(entry[1])
+
+    def set(self, user_id: str, user: dict):
+        if self.max_size <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, dict(user))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+user_cache = UserCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
 # Utility Functions
 def generate_otp():
     return ''.join(random.choices(string.digits, k=6))
 
+# OTP store: OTPs are kept as keyed hashes and looked up by identifier + method
+def hash_otp(otp: str, method: str, identifier: str) -> str:
+    message = f"{method}:{identifier}:{otp}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+async def store_otp(otp: str, method: str, identifier: str, extra: dict, ttl_minutes: int = 10):
+    """Persist a hashed OTP; `extra` carries registration/login context"""
+    now = datetime.utcnow()
+    record = {
+        **extra,
+        "identifier": identifier,
+        "method": method,
+        "otp_hash": hash_otp(otp, method, identifier),
+        "created_at": now,
+        "expires_at": now + timedelta(minutes=ttl_minutes)
+    }
+    await db.otps.insert_one(record)
+    return record
+
+async def consume_otp(otp: str, method: str, identifier: Optional[str]) -> Optional[dict]:
+    """Atomically find and delete a matching, unexpired OTP"""
+    if not identifier:
+        return None
+    return await db.otps.find_one_and_delete({
+        "identifier": identifier,
+        "method": method,
+        "otp_hash": hash_otp(otp, method, identifier),
+        "expires_at": {"$gt": datetime.utcnow()}
+    })
+
+# Job locations
+def normalize_place(name: Optional[str]) -> Optional[str]:
+    """Canonical form of a city/district name used for exact, indexed matches"""
+    if not name:
+        return None
+    return " ".join(name.split()).casefold() or None
+
+def city_of(location: Optional[str]) -> str:
+    """City part of a free-text location, e.g. "Pune" from "Pune, Maharashtra" """
+    return (location or "").split(",")[0]
+
+def job_location_fields(job: dict) -> dict:
+    """Derive normalized city/district and a GeoJSON point for a job posting"""
+    city = job.get("city") or city_of(job.get("location"))
+    fields = {
+        "city_norm": normalize_place(city),
+        "district_norm": normalize_place(job.get("district"))
+    }
+    if job.get("latitude") is not None and job.get("longitude") is not None:
+        fields["geo"] = {"type": "Point", "coordinates": [job["longitude"], job["latitude"]]}
+    return fields
+
+def job_place_filter(location: str) -> dict:
+    """Match postings by the same city extraction job_location_fields applies on write"""
+    place = normalize_place(city_of(location))
+    return {"$or": [{"city_norm": place}, {"district_norm": place}]}
+
+def parse_lat_lng(value: str) -> tuple:
+    """Parse a "lat,lng" query parameter"""
+    try:
+        lat, lng = (float(part) for part in value.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be 'latitude,longitude'")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="near is out of range")
+    return lat, lng
+
+# Keyset pagination over (created_at, id), newest first
+PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+def encode_cursor(doc: dict) -> str:
+    payload = json.dumps({"t": doc["created_at"].isoformat(), "id": doc["id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Turn an opaque cursor into the query for the page after it"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["t"])
+        last_id = str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": last_id}}
+    ]}
+
+async def fetch_page(
+    collection,
+    query: dict,
+    limit: int,
+    after: Optional[dict] = None,
+    skip: int = 0,
+    projection: Optional[dict] = None
+) -> tuple:
+    """Fetch one page sorted by PAGE_SORT and return (docs, next_cursor).
+
+    `after` is the decoded cursor query from decode_cursor().
+    """
+    if after:
+        query = {"$and": [query, after]} if query else after
+    find = collection.find(query, projection).sort(PAGE_SORT)
+    if skip and not after:
+        # Legacy offset paging for older clients
+        find = find.skip(skip)
+    docs = await find.limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+# Community feed cache
+class FeedCache:
+    """Ring buffer of the newest community posts, newest first.
+
+    Filled from Mongo on warm() and written through by create_community_post.
+    Posts made by other processes arrive through cache_invalidations; the
+    re-warm every refresh_seconds is a backstop for any that were missed.
+    """
+
+    def __init__(self, size: int, refresh_seconds: float):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self._posts: deque = deque(maxlen=max(1, size))
+        self._warmed_at: Optional[float] = None
+        self._warm_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._warmed_at is not None
+            and time.monotonic() - self._warmed_at < self.refresh_seconds
+        )
+
+    async def warm(self):
+        loaded = await db.community_posts.find({}, POST_LIST_PROJECTION).sort(PAGE_SORT).to_list(self.size)
+        # Keep posts written through while the query was in flight
+        known = {post["id"] for post in loaded}
+        merged = loaded + [post for post in self._posts if post["id"] not in known]
+        merged.sort(key=lambda post: (post["created_at"], post["id"]), reverse=True)
+        self._posts = deque(merged[:self.size], maxlen=max(1, self.size))
+        self._warmed_at = time.monotonic()
+
+    def add(self, post: dict) -> dict:
+        """Cache a new post if it's within the window; returns its list projection"""
+        post = {k: v for k, v in post.items() if POST_LIST_PROJECTION.get(k)}
+        key = (post["created_at"], post["id"])
+        if not self._posts or key > (self._posts[0]["created_at"], self._posts[0]["id"]):
+            self._posts.appendleft(post)
+            return post
+        # Posts relayed from other processes can arrive out of order
+        posts = list(self._posts)
+        if any(cached["id"] == post["id"] for cached in posts):
+            return post
+        if len(posts) == self._posts.maxlen and key < (posts[-1]["created_at"], posts[-1]["id"]):
+            return post
+        index = next((i for i, cached in enumerate(posts) if (cached["created_at"], cached["id"]) < key), len(posts))
+        posts.insert(index, post)
+        self._posts = deque(posts[:self._posts.maxlen], maxlen=self._posts.maxlen)
+        return post
+
+    async def first_page(self, limit: int) -> Optional[tuple]:
+        """Return (posts, next_cursor) for the first page, or None to fall back to Mongo"""
+        if self.size <= 0:
+            return None
+        if not self.is_fresh:
+            # One request re-warms; the rest wait for it instead of each querying Mongo
+            async with self._warm_lock:
+                if not self.is_fresh:
+                    await self.warm()
+        full = len(self._posts) == self._posts.maxlen
+        if limit > len(self._posts) and full:
+            self.misses += 1
+            return None
+        self.hits += 1
+        posts = [dict(post) for post in list(self._posts)[:limit]]
+        has_more = len(self._posts) > limit or (len(self._posts) == limit and full)
+        next_cursor = encode_cursor(posts[-1]) if has_more and posts else None
+        return posts, next_cursor
+
+    def apply_deltas(self, deltas: Dict[str, dict]):
+        """Fold flushed counter increments into cached posts"""
+        for post in self._posts:
+            for field, delta in deltas.get(post["id"], {}).items():
+                post[field] = post.get(field, 0) + delta
+
+    def stats(self) -> dict:
+        return {"size": len(self._posts), "hits": self.hits, "misses": self.misses}
+
+feed_cache = FeedCache(FEED_CACHE_SIZE, FEED_CACHE_REFRESH_SECONDS)
+
+# Cross-process state
+# Workers started by serve.py share nothing in memory. Rate-limit windows,
+# startup leases and cache invalidations therefore go through Mongo.
+PROCESS_ID = f"{os.uname().nodename}:{os.getpid()}"
+
+async def hit_rate_limit(scope: str, key: str, limit: int, window_seconds: int) -> Optional[int]:
+    """Count a hit in the current fixed window; returns seconds to wait once over the limit"""
+    now = time.time()
+    window = int(now // window_seconds)
+    window_end = (window + 1) * window_seconds
+    for attempt in range(2):
+        try:
+            counter = await db.rate_limits.find_one_and_update(
+                {"_id": f"{scope}:{key}:{window}"},
+                {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": datetime.utcfromtimestamp(window_end)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            break
+        except DuplicateKeyError:
+            # Two processes opened the same window at once; the retry increments it
+            if attempt:
+                raise
+    if counter["count"] > limit:
+        return max(1, int(window_end - now))
+    return None
+
+async def enforce_rate_limit(scope: str, key: str, limit: int, window_seconds: int):
+    """Raise 429 once `key` has used up its window; fails open if Mongo is unavailable"""
+    if limit <= 0:
+        return
+    try:
+        retry_after = await hit_rate_limit(scope, key, limit, window_seconds)
+    except Exception as e:
+        logger.error(f"Rate limit check for {scope} failed: {str(e)}")
+        return
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+async def acquire_lease(name: str, seconds: int) -> bool:
+    """Take a named lease shared by every process; False while another process holds it"""
+    now = datetime.utcnow()
+    try:
+        await db.leases.update_one(
+            {"_id": name, "$or": [{"expires_at": {"$lte": now}}, {"holder": PROCESS_ID}]},
+            {"$set": {"holder": PROCESS_ID, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def release_lease(name: str):
+    await db.leases.delete_one({"_id": name, "holder": PROCESS_ID})
+
+class CacheInvalidationFeed:
+    """Tells the other API processes which of their cached entries changed.
+
+    publish() appends an event to `cache_invalidations`, optionally carrying
+    the new value so receivers can apply it instead of re-reading Mongo;
+    run() polls for events written by other processes and calls the handler
+    registered for the topic. Polls overlap by lookback_seconds so late writes aren't missed;
+    events already handled are skipped by id.
+    """
+
+    def __init__(self, poll_seconds: float, lookback_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.lookback_seconds = lookback_seconds
+        self._handlers: Dict[str, object] = {}
+        self._seen: Dict[str, datetime] = {}
+        self._since: Optional[datetime] = None
+        self.published = 0
+        self.received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.poll_seconds > 0
+
+    def on(self, topic: str, handler):
+        """Register an async handler(key, payload) for a topic"""
+        self._handlers[topic] = handler
+
+    async def publish(self, topic: str, key: Optional[str] = None, payload: Optional[dict] = None):
+        if not self.enabled:
+            return
+        try:
+            await db.cache_invalidations.insert_one({
+                "id": str(uuid.uuid4()),
+                "topic": topic,
+                "key": key,
+                "payload": payload,
+                "origin": PROCESS_ID,
+                "at": datetime.utcnow()
+            })
+            self.published += 1
+        except Exception as e:
+            logger.error(f"Publishing {topic} invalidation failed: {str(e)}")
+
+    async def poll(self):
+        now = datetime.utcnow()
+        since = (self._since or now) - timedelta(seconds=self.lookback_seconds)
+        events = await db.cache_invalidations.find(
+            {"at": {"$gte": since}, "origin": {"$ne": PROCESS_ID}},
+            {"_id": 0}
+        ).sort("at", 1).to_list(None)
+        self._since = now
+        for event in events:
+            if event["id"] in self._seen:
+                continue
+            self._seen[event["id"]] = event["at"]
+            handler = self._handlers.get(event["topic"])
+            if handler is None:
+                continue
+            try:
+                await handler(event.get("key"), event.get("payload"))
+                self.received += 1
+            except Exception as e:
+                logger.error(f"Handling {event['topic']} invalidation failed: {str(e)}")
+        self._seen = {event_id: at for event_id, at in self._seen.items() if at >= since}
+
+    async def run(self, stop_event: asyncio.Event):
+        if not self.enabled:
+            return
+        while not stop_event.is_set():
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Cache invalidation poll failed: {str(e)}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {"published": self.published, "received": self.received}
+
+cache_invalidations = CacheInvalidationFeed(CACHE_SYNC_SECONDS, CACHE_SYNC_LOOKBACK_SECONDS)
+
+async def invalidate_user(user_id: str):
+    """Drop a user from this process's cache and tell the other processes to do the same"""
+    user_cache.invalidate(user_id)
+    await cache_invalidations.publish("user", user_id)
+
+async def on_user_invalidated(user_id: str, _payload: Optional[dict]):
+    user_cache.invalidate(user_id)
+
+async def on_post_created(_post_id: str, post: Optional[dict]):
+    # The event carries the post, so the ring buffer stays warm
+    if post:
+        feed_cache.add(post)
+
+cache_invalidations.on("user", on_user_invalidated)
+cache_invalidations.on("feed", on_post_created)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
@@ -140,56 +964,324 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_token(token: str) -> str:
+    """Validate a JWT and return the user id it was issued for"""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        user = await db.users.find_one({"id": user_id})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id
+
+async def load_user(user_id: str) -> Optional[dict]:
+    """Fetch a user document through the user cache"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    user = await db.users.find_one({"id": user_id})
+    if user is not None:
+        user_cache.set(user_id, user)
+    return user
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+    """Validate the bearer token without loading the user; returns the user id"""
+    return decode_token(credentials.credentials)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user_id = decode_token(credentials.credentials)
+    user = await load_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+# OTP delivery providers
+class OTPProvider(ABC):
+    """Interface for SMS/email gateways used to deliver OTPs and alerts"""
+    name = "base"
+
+    @abstractmethod
+    async def send_sms(self, phone: str, message: str) -> bool:
+        """Deliver `message` by SMS; return True once the gateway accepted it"""
+
+    @abstractmethod
+    async def send_email(self, email: str, message: str) -> bool:
+        """Deliver `message` by email; return True once the gateway accepted it"""
+
+class FakeOTPProvider(OTPProvider):
+    """Local provider that only logs messages and simulates gateway latency"""
+    name = "fake"
+
+    def __init__(self, latency_seconds: float = 1.0):
+        self.latency_seconds = latency_seconds
+
+    async def send_sms(self, phone: str, message: str) -> bool:
+        # This is a placeholder for SMS integration
+        # You would integrate with a real SMS service like Twilio
+        logger.info(f"Sending OTP {message} to phone {phone}")
+        await asyncio.sleep(self.latency_seconds)
+        return True
+
+    async def send_email(self, email: str, message: str) -> bool:
+        # This is a placeholder for email integration
+        logger.info(f"Sending OTP {message} to email {email}")
+        await asyncio.sleep(self.latency_seconds)
+        return True
+
+OTP_PROVIDERS = {
+    "fake": lambda: FakeOTPProvider(latency_seconds=OTP_FAKE_LATENCY_SECONDS),
+}
+
+def get_otp_provider(name: str) -> OTPProvider:
+    if name not in OTP_PROVIDERS:
+        raise ValueError(f"Unknown OTP provider: {name}")
+    return OTP_PROVIDERS[name]()
+
+otp_provider = get_otp_provider(OTP_PROVIDER)
 
 async def send_otp_sms(phone: str, otp: str):
-    """Send OTP via SMS using the provided API key"""
-    api_key = "Ec1gfIE4OQT5jCBwQHGv5KcdV1fGJE3K"
-    
-    # This is a placeholder for SMS integration
-    # You would integrate with a real SMS service like Twilio
-    logger.info(f"Sending OTP {otp} to phone {phone} using API key {api_key}")
-    
-    # Simulate SMS sending
-    await asyncio.sleep(1)
-    return True
+    """Send OTP via SMS through the configured provider"""
+    return await otp_provider.send_sms(phone, otp)
 
 async def send_otp_email(email: str, otp: str):
-    """Send OTP via email"""
-    # This is a placeholder for email integration
-    logger.info(f"Sending OTP {otp} to email {email}")
-    
-    # Simulate email sending
-    await asyncio.sleep(1)
-    return True
+    """Send OTP via email through the configured provider"""
+    return await otp_provider.send_email(email, otp)
+
+# OTP delivery queue: auth endpoints enqueue and return, workers talk to the provider
+otp_queue: Optional[asyncio.Queue] = None
+
+async def enqueue_otp_delivery(method: str, destination: str, otp: str):
+    """Hand an OTP to the delivery workers; only waits if the queue is full"""
+    if otp_queue is None:
+        # Workers not started (e.g. scripts importing the app), deliver inline
+        await deliver_otp(method, destination, otp)
+        return
+    await otp_queue.put((method, destination, otp, time.monotonic()))
+
+async def deliver_otp(method: str, destination: str, otp: str):
+    if method == 'phone':
+        await send_otp_sms(destination, otp)
+    else:
+        await send_otp_email(destination, otp)
+
+async def otp_delivery_worker(worker_id: int):
+    """Deliver queued OTPs, retrying each once before giving up"""
+    while True:
+        method, destination, otp, queued_at = await otp_queue.get()
+        try:
+            for attempt in range(2):
+                try:
+                    await asyncio.wait_for(
+                        deliver_otp(method, destination, otp),
+                        timeout=OTP_DELIVERY_TIMEOUT_SECONDS
+                    )
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"OTP delivery to {destination} failed (attempt {attempt + 1}): {str(e)}")
+            wait_ms = (time.monotonic() - queued_at) * 1000
+            logger.info(f"OTP worker {worker_id} handled {method} delivery, {wait_ms:.0f}ms after enqueue")
+        finally:
+            otp_queue.task_done()
 
-async def send_emergency_alert(user: dict, location: dict, contacts: List[dict]):
-    """Send emergency alerts to trusted contacts and authorities"""
+def start_otp_delivery_workers(count: int) -> List[asyncio.Task]:
+    global otp_queue
+    otp_queue = asyncio.Queue(maxsize=OTP_QUEUE_MAX_SIZE)
+    return [asyncio.create_task(otp_delivery_worker(i)) for i in range(max(1, count))]
+
+async def notify_contact(contact: dict, message: str, semaphore: asyncio.Semaphore) -> dict:
+    """Send one emergency SMS under the fan-out concurrency cap and report the outcome"""
+    result = {
+        "contact_id": contact.get("id"),
+        "name": contact.get("name"),
+        "phone": contact.get("phone"),
+        "status": "failed",
+        "latency_ms": None,
+        "error": None,
+    }
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                send_otp_sms(contact["phone"], message),
+                timeout=SOS_NOTIFY_TIMEOUT_SECONDS
+            )
+            result["status"] = "sent"
+            logger.info(f"Emergency alert sent to {contact.get('name')} at {contact['phone']}")
+        except asyncio.TimeoutError:
+            result["error"] = "timeout"
+            logger.error(f"Timed out sending alert to {contact.get('phone')}")
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"Failed to send alert to {contact.get('phone')}: {str(e)}")
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["notified_at"] = datetime.utcnow()
+    return result
+
+async def send_emergency_alert(user: dict, location: dict, contacts: List[dict], alert_id: Optional[str] = None):
+    """Send emergency alerts to trusted contacts and authorities.
+
+    All contacts are notified concurrently, at most SOS_NOTIFY_CONCURRENCY at a
+    time, so the time to the last notification tracks the slowest single send.
+    """
     message = f"EMERGENCY ALERT: {user['name']} has activated SOS. Location: {location.get('address', 'Unknown')}. Please check immediately."
-    
-    for contact in contacts:
+    sms_text = f"SOS ALERT from {user['name']}: {message}"
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, SOS_NOTIFY_CONCURRENCY))
+    results = await asyncio.gather(
+        *(notify_contact(contact, sms_text, semaphore) for contact in contacts)
+    )
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    sent = sum(1 for r in results if r["status"] == "sent")
+    logger.info(
+        f"SOS fan-out finished: {sent}/{len(results)} contacts notified, "
+        f"fan-out took {elapsed_ms}ms"
+    )
+
+    if alert_id:
+        # Retries re-notify only the contacts that failed: replace their earlier
+        # entries so each contact appears once, and time from the alert itself
+        now = datetime.utcnow()
+        contact_ids = [r["contact_id"] for r in results]
         try:
-            # Send SMS to contact
-            await send_otp_sms(contact['phone'], f"SOS ALERT from {user['name']}: {message}")
-            logger.info(f"Emergency alert sent to {contact['name']} at {contact['phone']}")
+            await db.sos_alerts.update_one(
+                {"id": alert_id},
+                [{"$set": {
+                    "contacts_notified": {"$concatArrays": [
+                        {"$filter": {
+                            "input": {"$ifNull": ["$contacts_notified", []]},
+                            "cond": {"$eq": [{"$in": ["$$this.contact_id", contact_ids]}, False]}
+                        }},
+                        {"$literal": list(results)}
+                    ]},
+                    "notification_completed_at": now,
+                    "time_to_last_notification_ms": {"$subtract": [now, "$timestamp"]}
+                }}]
+            )
         except Exception as e:
-            logger.error(f"Failed to send alert to {contact['phone']}: {str(e)}")
+            logger.error(f"Failed to record SOS notification results for {alert_id}: {str(e)}")
+
+    return {
+        "contacts_notified": list(results),
+        "sent": sent,
+        "failed": len(results) - sent,
+        "time_to_last_notification_ms": elapsed_ms
+    }
+
+# SOS Outbox
+def outbox_backoff_seconds(attempts: int) -> float:
+    """Exponential backoff between delivery attempts, capped"""
+    delay = SOS_OUTBOX_BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1))
+    return min(delay, SOS_OUTBOX_BACKOFF_MAX_SECONDS)
+
+def sos_delivery_state(user: dict, contacts: List[dict]) -> dict:
+    """Outbox state embedded in a new SOS alert, so the alert and its job are one insert"""
+    now = datetime.utcnow()
+    return {
+        "status": "pending",  # pending, processing, done, dead
+        "user": {"id": user["id"], "name": user["name"]},
+        "contacts": contacts,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "locked_by": None,
+        "locked_until": None,
+        "last_error": None,
+        "updated_at": now
+    }
+
+async def claim_outbox_job(worker_id: str) -> Optional[dict]:
+    """Atomically claim the oldest alert due for delivery, or one whose lease has expired"""
+    now = datetime.utcnow()
+    return await db.sos_alerts.find_one_and_update(
+        {"$or": [
+            {"delivery.status": "pending", "delivery.next_attempt_at": {"$lte": now}},
+            {"delivery.status": "processing", "delivery.locked_until": {"$lt": now}}
+        ]},
+        {
+            "$set": {
+                "delivery.status": "processing",
+                "delivery.locked_by": worker_id,
+                "delivery.locked_until": now + timedelta(seconds=SOS_OUTBOX_LEASE_SECONDS),
+                "delivery.updated_at": now
+            },
+            "$inc": {"delivery.attempts": 1}
+        },
+        sort=[("delivery.next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def process_outbox_job(job: dict, worker_id: str):
+    """Deliver a claimed alert; failed contacts are rescheduled with backoff"""
+    delivery = job["delivery"]
+    try:
+        summary = await send_emergency_alert(delivery["user"], job.get("location") or {}, delivery["contacts"], job["id"])
+        failed = [
+            contact for contact, result in zip(delivery["contacts"], summary["contacts_notified"])
+            if result["status"] != "sent"
+        ]
+        error = f"{len(failed)} contact(s) failed" if failed else None
+    except Exception as e:
+        failed = delivery["contacts"]
+        error = str(e)
+        logger.error(f"SOS delivery for alert {job['id']} failed: {error}")
+
+    now = datetime.utcnow()
+    if not failed:
+        update = {"status": "done", "completed_at": now}
+    elif delivery["attempts"] >= SOS_OUTBOX_MAX_ATTEMPTS:
+        update = {"status": "dead", "contacts": failed}
+        logger.error(f"SOS delivery for alert {job['id']} gave up after {delivery['attempts']} attempts")
+    else:
+        update = {
+            "status": "pending",
+            "contacts": failed,
+            "next_attempt_at": now + timedelta(seconds=outbox_backoff_seconds(delivery["attempts"]))
+        }
+    update.update({"locked_by": None, "locked_until": None, "last_error": error, "updated_at": now})
+
+    # Only the lease holder may settle the job
+    await db.sos_alerts.update_one(
+        {"id": job["id"], "delivery.locked_by": worker_id},
+        {"$set": {f"delivery.{field}": value for field, value in update.items()}}
+    )
+
+async def outbox_worker(worker_id: str, stop_event: asyncio.Event):
+    """Drain the SOS outbox until stop_event is set"""
+    logger.info(f"SOS outbox worker {worker_id} started")
+    while not stop_event.is_set():
+        try:
+            job = await claim_outbox_job(worker_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=SOS_OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await process_outbox_job(job, worker_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"SOS outbox worker {worker_id} error: {str(e)}")
+            await asyncio.sleep(SOS_OUTBOX_POLL_SECONDS)
+    logger.info(f"SOS outbox worker {worker_id} stopped")
+
+def start_outbox_workers(count: int, stop_event: asyncio.Event) -> List[asyncio.Task]:
+    """Spawn `count` outbox workers on the running event loop"""
+    prefix = f"{os.uname().nodename}:{os.getpid()}"
+    return [
+        asyncio.create_task(outbox_worker(f"{prefix}:{i}", stop_event))
+        for i in range(count)
+    ]
 
 # Authentication Routes
 @api_router.post("/auth/register")
 async def register_user(user_data: UserRegister):
+    destination = user_data.phone if user_data.method == 'phone' else user_data.email
+    await enforce_rate_limit("otp", destination, OTP_RATE_LIMIT, OTP_RATE_LIMIT_WINDOW_SECONDS)
     try:
         # Check if user already exists
         query = {}
@@ -204,23 +1296,19 @@ async def register_user(user_data: UserRegister):
         
         # Generate and store OTP
         otp = generate_otp()
-        otp_data = {
-            "otp": otp,
-            "method": user_data.method,
-            "phone": user_data.phone,
-            "email": user_data.email,
-            "name": user_data.name,
-            "created_at": datetime.utcnow(),
-            "expires_at": datetime.utcnow() + timedelta(minutes=10)
-        }
-        
-        await db.otps.insert_one(otp_data)
+        await store_otp(
+            otp,
+            user_data.method,
+            destination,
+            {
+                "phone": user_data.phone,
+                "email": user_data.email,
+                "name": user_data.name
+            }
+        )
         
-        # Send OTP
-        if user_data.method == 'phone':
-            await send_otp_sms(user_data.phone, otp)
-        else:
-            await send_otp_email(user_data.email, otp)
+        # Queue OTP for delivery
+        await enqueue_otp_delivery(user_data.method, destination, otp)
             
         return {"success": True, "message": "OTP sent successfully"}
         
@@ -230,6 +1318,8 @@ async def register_user(user_data: UserRegister):
 
 @api_router.post("/auth/login")
 async def login_user(user_data: UserLogin):
+    destination = user_data.phone if user_data.method == 'phone' else user_data.email
+    await enforce_rate_limit("otp", destination, OTP_RATE_LIMIT, OTP_RATE_LIMIT_WINDOW_SECONDS)
     try:
         # Check if user exists
         query = {}
@@ -244,23 +1334,19 @@ async def login_user(user_data: UserLogin):
         
         # Generate and store OTP
         otp = generate_otp()
-        otp_data = {
-            "otp": otp,
-            "method": user_data.method,
-            "phone": user_data.phone,
-            "email": user_data.email,
-            "user_id": user["id"],
-            "created_at": datetime.utcnow(),
-            "expires_at": datetime.utcnow() + timedelta(minutes=10)
-        }
-        
-        await db.otps.insert_one(otp_data)
+        await store_otp(
+            otp,
+            user_data.method,
+            destination,
+            {
+                "phone": user_data.phone,
+                "email": user_data.email,
+                "user_id": user["id"]
+            }
+        )
         
-        # Send OTP
-        if user_data.method == 'phone':
-            await send_otp_sms(user_data.phone, otp)
-        else:
-            await send_otp_email(user_data.email, otp)
+        # Queue OTP for delivery
+        await enqueue_otp_delivery(user_data.method, destination, otp)
             
         return {"success": True, "message": "OTP sent successfully"}
         
@@ -271,19 +1357,9 @@ async def login_user(user_data: UserLogin):
 @api_router.post("/auth/verify-otp")
 async def verify_otp(otp_data: OTPVerify):
     try:
-        # Find OTP record
-        query = {
-            "otp": otp_data.otp,
-            "method": otp_data.method,
-            "expires_at": {"$gt": datetime.utcnow()}
-        }
-        
-        if otp_data.method == 'phone':
-            query["phone"] = otp_data.phone
-        else:
-            query["email"] = otp_data.email
-            
-        otp_record = await db.otps.find_one(query)
+        # Verify and consume the OTP in one indexed round trip
+        identifier = otp_data.phone if otp_data.method == 'phone' else otp_data.email
+        otp_record = await consume_otp(otp_data.otp, otp_data.method, identifier)
         if not otp_record:
             return {"success": False, "message": "Invalid or expired OTP"}
         
@@ -297,6 +1373,7 @@ async def verify_otp(otp_data: OTPVerify):
                 {"id": user["id"]},
                 {"$set": {"last_login": datetime.utcnow()}}
             )
+            await invalidate_user(user["id"])
         else:
             # Registration - create new user
             user_data = User(
@@ -313,9 +1390,6 @@ async def verify_otp(otp_data: OTPVerify):
             await db.users.insert_one(user_dict)
             user = user_dict
         
-        # Delete used OTP
-        await db.otps.delete_one({"_id": otp_record["_id"]})
-        
         # Create access token
         access_token = create_access_token(data={"sub": user["id"]})
         
@@ -340,38 +1414,229 @@ async def verify_otp(otp_data: OTPVerify):
         logger.error(f"OTP verification error: {str(e)}")
         raise HTTPException(status_code=500, detail="OTP verification failed")
 
+# Nearby responders
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat: float, lng: float, lats: "np.ndarray", lngs: "np.ndarray") -> "np.ndarray":
+    """Great-circle distance from one point to arrays of points, vectorized"""
+    import numpy as np
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+RESPONDER_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "phone": 1, "type": 1, "latitude": 1, "longitude": 1, "is_active": 1
+}
+
+class ResponderIndex:
+    """In-memory grid of active responders (volunteers, NGO partners).
+
+    Responders are bucketed into cell_degrees x cell_degrees cells. A lookup
+    gathers the cells overlapping the search radius, then ranks those
+    candidates with one vectorized haversine pass. Each cell's coordinate
+    array is rebuilt only when a responder in it moves.
+    """
+
+    def __init__(self, cell_degrees: float, refresh_seconds: float):
+        self.cell_degrees = cell_degrees
+        self.refresh_seconds = refresh_seconds
+        self._responders: Dict[str, dict] = {}
+        self._cells: Dict[tuple, Dict[str, tuple]] = {}
+        self._arrays: Dict[tuple, tuple] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return (math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees))
+
+    def upsert(self, responder: dict):
+        responder_id = responder["id"]
+        self.remove(responder_id)
+        if not responder.get("is_active", True):
+            return
+        lat, lng = responder["latitude"], responder["longitude"]
+        cell = self._cell(lat, lng)
+        self._responders[responder_id] = {**responder, "_cell": cell}
+        self._cells.setdefault(cell, {})[responder_id] = (lat, lng)
+        self._arrays.pop(cell, None)
+
+    def remove(self, responder_id: str):
+        previous = self._responders.pop(responder_id, None)
+        if previous is None:
+            return
+        cell = previous["_cell"]
+        members = self._cells.get(cell, {})
+        members.pop(responder_id, None)
+        if not members:
+            self._cells.pop(cell, None)
+        self._arrays.pop(cell, None)
+
+    def _cell_arrays(self, cell: tuple) -> Optional[tuple]:
+        if cell not in self._cells:
+            return None
+        if cell not in self._arrays:
+            import numpy as np
+            members = self._cells[cell]
+            ids = list(members)
+            coords = np.array([members[i] for i in ids], dtype=np.float64).reshape(-1, 2)
+            self._arrays[cell] = (ids, coords)
+        return self._arrays[cell]
+
+    async def load(self):
+        """Rebuild the index from the responders collection"""
+        responders = await db.responders.find({"is_active": True}, RESPONDER_PROJECTION).to_list(None)
+        self._responders, self._cells, self._arrays = {}, {}, {}
+        for responder in responders:
+            self.upsert(responder)
+        self._loaded_at = time.monotonic()
+        logger.info(f"Responder index loaded with {len(self._responders)} responder(s)")
+
+    async def reload_one(self, responder_id: str):
+        """Re-read one responder, e.g. after another process recorded a new position"""
+        responder = await db.responders.find_one({"id": responder_id}, RESPONDER_PROJECTION)
+        if responder is None:
+            self.remove(responder_id)
+        else:
+            self.upsert(responder)
+
+    async def run(self, stop_event: asyncio.Event):
+        """Reload periodically as a backstop for missed cross-process updates"""
+        while not stop_event.is_set():
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Responder index refresh failed: {str(e)}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def nearest(self, lat: float, lng: float, k: int, radius_km: float) -> List[dict]:
+        """Return up to k responders within radius_km, nearest first"""
+        import numpy as np
+        if self._loaded_at is None:
+            await self.load()
+        
+        # Cells covering the radius; longitude cells shrink towards the poles
+        lat_span = radius_km / 111.32
+        lng_span = radius_km / max(111.32 * np.cos(np.radians(lat)), 1e-6)
+        min_cell = self._cell(lat - lat_span, max(lng - lng_span, -180.0))
+        max_cell = self._cell(lat + lat_span, min(lng + lng_span, 180.0))
+        
+        ids: List[str] = []
+        chunks = []
+        for cell_lat in range(min_cell[0], max_cell[0] + 1):
+            for cell_lng in range(min_cell[1], max_cell[1] + 1):
+                arrays = self._cell_arrays((cell_lat, cell_lng))
+                if arrays is not None:
+                    ids.extend(arrays[0])
+                    chunks.append(arrays[1])
+        if not chunks:
+            return []
+        
+        coords = np.concatenate(chunks)
+        distances = haversine_km(lat, lng, coords[:, 0], coords[:, 1])
+        within = np.flatnonzero(distances <= radius_km)
+        if within.size > k:
+            within = within[np.argpartition(distances[within], k - 1)[:k]]
+        within = within[np.argsort(distances[within])]
+        
+        nearest = []
+        for i in within:
+            responder = self._responders[ids[i]]
+            nearest.append({
+                "id": responder["id"],
+                "name": responder.get("name"),
+                "phone": responder.get("phone"),
+                "type": responder.get("type"),
+                "distance_km": round(float(distances[i]), 3)
+            })
+        return nearest
+
+responder_index = ResponderIndex(RESPONDER_CELL_DEGREES, RESPONDER_INDEX_REFRESH_SECONDS)
+cache_invalidations.on("responder", lambda responder_id, _payload: responder_index.reload_one(responder_id))
+
+def location_lat_lng(location: Optional[dict]) -> Optional[tuple]:
+    """Extract (lat, lng) from an SOS location payload, if it has one"""
+    if not location:
+        return None
+    try:
+        lat = float(location.get("latitude", location.get("lat")))
+        lng = float(location.get("longitude", location.get("lng")))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+@api_router.post("/responders/location")
+async def update_responder_location(
+    location: ResponderLocation,
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user.get("role") not in PRIVILEGED_ROLES:
+        raise HTTPException(status_code=403, detail="Only volunteers and NGO partners can share responder locations")
+    try:
+        responder = {
+            "id": current_user["id"],
+            "name": current_user["name"],
+            "phone": current_user.get("phone"),
+            "type": current_user.get("role"),
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "is_active": location.is_active,
+            "updated_at": datetime.utcnow()
+        }
+        await db.responders.update_one({"id": responder["id"]}, {"$set": responder}, upsert=True)
+        responder_index.upsert(responder)
+        await cache_invalidations.publish("responder", responder["id"])
+        
+        return {"success": True, "message": "Responder location updated"}
+        
+    except Exception as e:
+        logger.error(f"Update responder location error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update responder location")
+
 # SOS Routes
 @api_router.post("/sos/activate")
 async def activate_sos(
     sos_data: dict,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     try:
         # Create SOS alert record
         alert = SOSAlert(
             user_id=current_user["id"],
-            location=sos_data.get("location", {}),
+            location=sos_data.get("location") or {},
             is_stealth=sos_data.get("is_stealth", False)
         )
         
-        await db.sos_alerts.insert_one(alert.dict())
+        # Find the closest responders from the in-memory index
+        nearby_responders = []
+        origin = location_lat_lng(alert.location)
+        if origin:
+            try:
+                nearby_responders = await responder_index.nearest(
+                    origin[0], origin[1], RESPONDER_NEAREST_K, RESPONDER_SEARCH_RADIUS_KM
+                )
+            except Exception as e:
+                logger.error(f"Nearby responder lookup failed: {str(e)}")
         
-        # Get user's trusted contacts
-        contacts = current_user.get("trusted_contacts", [])
-        
-        # Send emergency alerts in background
-        background_tasks.add_task(
-            send_emergency_alert,
-            current_user,
-            sos_data.get("location", {}),
-            contacts
-        )
+        alert_dict = alert.dict()
+        alert_dict["nearby_responders"] = nearby_responders
+        # The alert carries its own delivery state, so storing it also queues
+        # the notifications to trusted contacts; there is no second write to lose
+        alert_dict["delivery"] = sos_delivery_state(current_user, current_user.get("trusted_contacts", []))
+        await db.sos_alerts.insert_one(alert_dict)
         
         return {
             "success": True,
             "message": "SOS activated successfully",
-            "alert_id": alert.id
+            "alert_id": alert.id,
+            "nearby_responders": nearby_responders
         }
         
     except Exception as e:
@@ -403,20 +1668,519 @@ async def deactivate_sos(
 async def get_sos_alerts(current_user: dict = Depends(get_current_user)):
     try:
         alerts = await db.sos_alerts.find(
-            {"user_id": current_user["id"]}
+            {"user_id": current_user["id"]},
+            SOS_ALERT_LIST_PROJECTION
         ).sort("timestamp", -1).limit(50).to_list(50)
         
-        # Convert ObjectId to string for JSON serialization
-        for alert in alerts:
-            if "_id" in alert:
-                alert["_id"] = str(alert["_id"])
-        
-        return {"success": True, "alerts": alerts}
+        return FastJSONResponse({"success": True, "alerts": alerts})
         
     except Exception as e:
         logger.error(f"Get SOS alerts error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch SOS alerts")
 
+# Live SOS location streaming
+def parse_location_ping(data) -> Optional[dict]:
+    """Validate a device ping: {"lat", "lng", optional "accuracy", optional "ts" (epoch ms)}"""
+    if not isinstance(data, dict):
+        return None
+    try:
+        lat, lng = float(data["lat"]), float(data["lng"])
+        accuracy = float(data["accuracy"]) if data.get("accuracy") is not None else None
+        ts = datetime.utcfromtimestamp(data["ts"] / 1000) if data.get("ts") is not None else datetime.utcnow()
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return {"lat": lat, "lng": lng, "accuracy": accuracy, "ts": ts}
+
+class LocationStreamHub:
+    """Relays live SOS location pings to watchers and batches their persistence.
+
+    Pings are pushed to subscribed sockets as they arrive, buffered, and
+    written to the `sos_locations` time-series collection with one
+    insert_many per flush. Each alert's latest position is written back to
+    `sos_alerts` once per flush rather than once per ping.
+
+    With several API processes the device and its watchers may be connected
+    to different workers, so each flush also relays points that other
+    processes wrote for locally watched alerts.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._watchers: Dict[str, set] = {}
+        self._buffer: List[dict] = []
+        self._latest: Dict[str, dict] = {}
+        self._relayed_up_to: Dict[str, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self.pings = 0
+        self.points_written = 0
+        self.points_relayed = 0
+
+    def watch(self, alert_id: str, websocket: WebSocket):
+        if alert_id not in self._watchers:
+            self._relayed_up_to[alert_id] = datetime.utcnow()
+        self._watchers.setdefault(alert_id, set()).add(websocket)
+
+    def unwatch(self, alert_id: str, websocket: WebSocket):
+        watchers = self._watchers.get(alert_id)
+        if watchers is not None:
+            watchers.discard(websocket)
+            if not watchers:
+                del self._watchers[alert_id]
+                self._relayed_up_to.pop(alert_id, None)
+
+    async def publish(self, alert_id: str, user_id: str, ping: dict):
+        self.pings += 1
+        point = {"type": "Point", "coordinates": [ping["lng"], ping["lat"]]}
+        self._buffer.append({
+            "ts": ping["ts"],
+            "meta": {"alert_id": alert_id, "user_id": user_id, "origin": PROCESS_ID},
+            "location": point,
+            "accuracy": ping["accuracy"],
+            "received_at": datetime.utcnow()
+        })
+        self._latest[alert_id] = {"location": point, "ts": ping["ts"]}
+        await self._broadcast(alert_id, self._message(alert_id, ping["lat"], ping["lng"], ping["accuracy"], ping["ts"]))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    @staticmethod
+    def _message(alert_id: str, lat: float, lng: float, accuracy: Optional[float], ts: datetime) -> dict:
+        return {"alert_id": alert_id, "lat": lat, "lng": lng, "accuracy": accuracy, "ts": ts.isoformat()}
+
+    async def _broadcast(self, alert_id: str, message: dict):
+        watchers = list(self._watchers.get(alert_id, ()))
+        if not watchers:
+            return
+        text = json.dumps(message)
+        results = await asyncio.gather(
+            *(websocket.send_text(text) for websocket in watchers),
+            return_exceptions=True
+        )
+        for websocket, result in zip(watchers, results):
+            if isinstance(result, Exception):
+                self.unwatch(alert_id, websocket)
+
+    async def flush(self):
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            latest, self._latest = self._latest, {}
+            if not batch and not latest:
+                return
+            unwritten = []
+            try:
+                if batch:
+                    await db.sos_locations.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything not listed in writeErrors was stored
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                unwritten = [point for index, point in enumerate(batch) if index in failed]
+                logger.error(f"SOS location flush failed for {len(unwritten)} of {len(batch)} point(s): {str(e)}")
+            except Exception as e:
+                unwritten = batch
+                logger.error(f"SOS location flush of {len(batch)} point(s) failed: {str(e)}")
+            self.points_written += len(batch) - len(unwritten)
+            if unwritten:
+                # Keep the points for the next flush, bounded so a dead DB can't exhaust memory
+                self._buffer[:0] = unwritten[-self.batch_size * 10:]
+            
+            try:
+                await db.sos_alerts.bulk_write([
+                    UpdateOne(
+                        {"id": alert_id},
+                        {"$set": {"last_location": entry["location"], "last_location_at": entry["ts"]}}
+                    )
+                    for alert_id, entry in latest.items()
+                ], ordered=False)
+            except Exception as e:
+                logger.error(f"SOS latest-location update for {len(latest)} alert(s) failed: {str(e)}")
+                # Retry next flush unless a newer ping has replaced the position since
+                for alert_id, entry in latest.items():
+                    self._latest.setdefault(alert_id, entry)
+
+    async def relay(self):
+        """Push points persisted by other processes to this process's watchers"""
+        if not self._relayed_up_to:
+            return
+        try:
+            points = await db.sos_locations.find(
+                {
+                    "meta.alert_id": {"$in": list(self._relayed_up_to)},
+                    "meta.origin": {"$ne": PROCESS_ID},
+                    "received_at": {"$gt": min(self._relayed_up_to.values())}
+                },
+                {"_id": 0, "meta.alert_id": 1, "location": 1, "accuracy": 1, "ts": 1, "received_at": 1}
+            ).sort("received_at", 1).to_list(None)
+        except Exception as e:
+            logger.error(f"SOS location relay failed: {str(e)}")
+            return
+        for point in points:
+            alert_id = point["meta"]["alert_id"]
+            relayed_up_to = self._relayed_up_to.get(alert_id)
+            if relayed_up_to is None or point["received_at"] <= relayed_up_to:
+                continue
+            self._relayed_up_to[alert_id] = point["received_at"]
+            lng, lat = point["location"]["coordinates"]
+            await self._broadcast(alert_id, self._message(alert_id, lat, lng, point.get("accuracy"), point["ts"]))
+            self.points_relayed += 1
+
+    async def run(self, stop_event: asyncio.Event):
+        """Flush and relay periodically until stop_event is set, then flush what's left"""
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            await self.relay()
+
+    def stats(self) -> dict:
+        return {
+            "alerts_watched": len(self._watchers),
+            "buffered": len(self._buffer),
+            "pings": self.pings,
+            "points_written": self.points_written,
+            "points_relayed": self.points_relayed
+        }
+
+location_hub = LocationStreamHub(SOS_LOCATION_FLUSH_BATCH, SOS_LOCATION_FLUSH_SECONDS)
+
+@api_router.websocket("/sos/{alert_id}/stream")
+async def sos_location_stream(websocket: WebSocket, alert_id: str, token: str, role: str = "device"):
+    """Live location channel for an SOS alert.
+
+    role=device: the alert owner's phone sends {"lat", "lng", "accuracy", "ts"} pings.
+    role=watcher: the owner or one of their trusted contacts receives them.
+    """
+    try:
+        user_id = decode_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    alert = await db.sos_alerts.find_one({"id": alert_id}, {"_id": 0, "user_id": 1, "status": 1})
+    user = await load_user(user_id)
+    if alert is None or user is None:
+        await websocket.close(code=1008)
+        return
+    
+    is_owner = alert["user_id"] == user_id
+    if role == "device":
+        allowed = is_owner and alert["status"] == "active"
+    elif role == "watcher":
+        allowed = is_owner
+        if not allowed and user.get("phone"):
+            owner = await load_user(alert["user_id"])
+            contact_phones = {c.get("phone") for c in (owner or {}).get("trusted_contacts", [])}
+            allowed = user["phone"] in contact_phones
+    else:
+        allowed = False
+    if not allowed:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    try:
+        if role == "watcher":
+            location_hub.watch(alert_id, websocket)
+            while True:
+                # Watchers only listen; drain anything they send to detect disconnects
+                await websocket.receive_text()
+        
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except ValueError:
+                data = None
+            ping = parse_location_ping(data)
+            if ping is None:
+                await websocket.send_json({"error": "Invalid location ping"})
+                continue
+            await location_hub.publish(alert_id, user_id, ping)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        location_hub.unwatch(alert_id, websocket)
+
+# SOS media uploads
+# aiofiles is imported inside the upload handlers; most requests never touch it
+def safe_filename(filename: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(filename or ""))[:100]
+    return name.lstrip(".") or "media"
+
+def upload_part_path(upload_id: str) -> Path:
+    return MEDIA_ROOT / ".partial" / f"{upload_id}.part"
+
+async def remove_part(part: Path):
+    import aiofiles.os
+    try:
+        await aiofiles.os.remove(part)
+    except FileNotFoundError:
+        pass
+
+def stale_part_files(cutoff: float) -> Dict[str, Path]:
+    """Part files untouched since cutoff (epoch seconds), by upload id"""
+    stale = {}
+    for part in (MEDIA_ROOT / ".partial").glob("*.part"):
+        try:
+            if part.stat().st_mtime < cutoff:
+                stale[part.stem] = part
+        except FileNotFoundError:
+            continue
+    return stale
+
+async def sweep_upload_parts() -> int:
+    """Delete part files left by expired sessions or failed single-request uploads"""
+    stale = await asyncio.to_thread(stale_part_files, time.time() - MEDIA_UPLOAD_SESSION_TTL_SECONDS)
+    if not stale:
+        return 0
+    live = await db.media_uploads.find(
+        {"id": {"$in": list(stale)}, "status": "uploading"},
+        {"_id": 0, "id": 1}
+    ).to_list(None)
+    for upload in live:
+        stale.pop(upload["id"], None)
+    for part in stale.values():
+        await remove_part(part)
+    if stale:
+        logger.info(f"Removed {len(stale)} abandoned upload part file(s)")
+    return len(stale)
+
+async def run_upload_sweeper(stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        try:
+            await sweep_upload_parts()
+        except Exception as e:
+            logger.error(f"Upload part sweep failed: {str(e)}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=MEDIA_UPLOAD_SWEEP_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def get_owned_alert(alert_id: str, user_id: str) -> dict:
+    alert = await db.sos_alerts.find_one({"id": alert_id, "user_id": user_id}, {"_id": 0, "id": 1})
+    if alert is None:
+        raise HTTPException(status_code=404, detail="SOS alert not found")
+    return alert
+
+async def file_sha256(path: Path) -> str:
+    import aiofiles
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            block = await f.read(MEDIA_UPLOAD_CHUNK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+async def attach_media(alert_id: str, source: Path, upload_id: str, filename: str) -> str:
+    """Move a finished upload into place and record it on the alert"""
+    import aiofiles.os
+    relative = f"{alert_id}/{upload_id}_{safe_filename(filename)}"
+    destination = MEDIA_ROOT / relative
+    await aiofiles.os.makedirs(destination.parent, exist_ok=True)
+    await aiofiles.os.replace(source, destination)
+    await db.sos_alerts.update_one({"id": alert_id}, {"$push": {"media_files": relative}})
+    return relative
+
+def upload_status(upload: dict) -> dict:
+    return {
+        "upload_id": upload["id"],
+        "alert_id": upload["alert_id"],
+        "offset": upload["offset"],
+        "total_size": upload["total_size"],
+        "status": upload["status"],
+        "chunk_size": MEDIA_UPLOAD_CHUNK_BYTES,
+        "media_file": upload.get("media_file")
+    }
+
+@api_router.post("/sos/uploads")
+async def start_media_upload(
+    upload_data: MediaUploadInit,
+    current_user: dict = Depends(get_current_user)
+):
+    """Open a resumable upload session for SOS evidence"""
+    import aiofiles
+    import aiofiles.os
+    if upload_data.total_size > MEDIA_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+    await get_owned_alert(upload_data.alert_id, current_user["id"])
+    try:
+        now = datetime.utcnow()
+        upload = {
+            "id": str(uuid.uuid4()),
+            "user_id": current_user["id"],
+            "alert_id": upload_data.alert_id,
+            "filename": safe_filename(upload_data.filename),
+            "content_type": upload_data.content_type,
+            "total_size": upload_data.total_size,
+            "sha256": upload_data.sha256.lower() if upload_data.sha256 else None,
+            "offset": 0,
+            "status": "uploading",  # uploading, complete
+            "locked_until": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        part = upload_part_path(upload["id"])
+        await aiofiles.os.makedirs(part.parent, exist_ok=True)
+        async with aiofiles.open(part, "wb"):
+            pass
+        await db.media_uploads.insert_one(upload)
+        
+        return {"success": True, **upload_status(upload)}
+        
+    except Exception as e:
+        logger.error(f"Start media upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to start upload")
+
+@api_router.get("/sos/uploads/{upload_id}")
+async def get_media_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    """Current offset of an upload, so the client knows where to resume"""
+    upload = await db.media_uploads.find_one({"id": upload_id, "user_id": current_user["id"]}, {"_id": 0})
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"success": True, **upload_status(upload)}
+
+@api_router.patch("/sos/uploads/{upload_id}")
+async def append_media_chunk(
+    upload_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Append one chunk at `Upload-Offset`.
+
+    The raw request body is streamed to disk and hashed as it arrives; it must
+    match the `X-Chunk-SHA256` header or the chunk is rolled back.
+    """
+    import aiofiles
+    import aiofiles.os
+    try:
+        offset = int(request.headers["upload-offset"])
+        expected_sha = request.headers["x-chunk-sha256"].lower()
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset and X-Chunk-SHA256 headers are required")
+    
+    # Claim the session at this offset so concurrent retries can't interleave
+    now = datetime.utcnow()
+    upload = await db.media_uploads.find_one_and_update(
+        {
+            "id": upload_id,
+            "user_id": current_user["id"],
+            "status": "uploading",
+            "offset": offset,
+            "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]
+        },
+        {"$set": {"locked_until": now + timedelta(seconds=MEDIA_UPLOAD_LEASE_SECONDS)}},
+        return_document=ReturnDocument.AFTER
+    )
+    if upload is None:
+        current = await db.media_uploads.find_one({"id": upload_id, "user_id": current_user["id"]}, {"_id": 0})
+        if current is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if current["status"] != "uploading" or current["offset"] != offset:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Offset mismatch", **upload_status(current)}
+            )
+        raise HTTPException(status_code=409, detail="Another chunk is being written")
+    
+    part = upload_part_path(upload_id)
+    remaining = upload["total_size"] - offset
+    written = 0
+    digest = hashlib.sha256()
+    error = None
+    try:
+        async with aiofiles.open(part, "r+b") as f:
+            # Drop any bytes left behind by an interrupted write
+            await f.truncate(offset)
+            await f.seek(offset)
+            async for piece in request.stream():
+                written += len(piece)
+                if written > MEDIA_UPLOAD_MAX_CHUNK_BYTES or written > remaining:
+                    error = HTTPException(status_code=413, detail="Chunk too large")
+                    break
+                digest.update(piece)
+                await f.write(piece)
+            if error is None and digest.hexdigest() != expected_sha:
+                error = HTTPException(status_code=400, detail="Chunk checksum mismatch")
+            if error is not None:
+                await f.truncate(offset)
+    except Exception as e:
+        logger.error(f"Media chunk write error: {str(e)}")
+        error = HTTPException(status_code=500, detail="Failed to store chunk")
+    
+    if error is not None:
+        await db.media_uploads.update_one({"id": upload_id}, {"$set": {"locked_until": None}})
+        raise error
+    
+    new_offset = offset + written
+    update = {"offset": new_offset, "locked_until": None, "updated_at": datetime.utcnow()}
+    if new_offset == upload["total_size"]:
+        if upload.get("sha256") and await file_sha256(part) != upload["sha256"]:
+            await db.media_uploads.update_one({"id": upload_id}, {"$set": {"offset": 0, "locked_until": None}})
+            async with aiofiles.open(part, "wb"):
+                pass
+            raise HTTPException(status_code=400, detail="File checksum mismatch, upload restarted")
+        update["media_file"] = await attach_media(upload["alert_id"], part, upload_id, upload["filename"])
+        update["status"] = "complete"
+    await db.media_uploads.update_one({"id": upload_id}, {"$set": update})
+    
+    return {"success": True, **upload_status({**upload, **update})}
+
+@api_router.post("/sos/upload-media")
+async def upload_sos_media(
+    file: UploadFile = File(...),
+    alert_id: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Single-request upload used by the mobile client; streamed to disk in chunks"""
+    import aiofiles
+    import aiofiles.os
+    if alert_id:
+        alert = await get_owned_alert(alert_id, current_user["id"])
+    else:
+        alert = await db.sos_alerts.find_one(
+            {"user_id": current_user["id"], "status": "active"},
+            {"_id": 0, "id": 1},
+            sort=[("timestamp", -1)]
+        )
+        if alert is None:
+            raise HTTPException(status_code=404, detail="No active SOS alert")
+    
+    upload_id = str(uuid.uuid4())
+    part = upload_part_path(upload_id)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        await aiofiles.os.makedirs(part.parent, exist_ok=True)
+        async with aiofiles.open(part, "wb") as f:
+            while True:
+                block = await file.read(MEDIA_UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > MEDIA_UPLOAD_MAX_BYTES:
+                    break
+                digest.update(block)
+                await f.write(block)
+        if size > MEDIA_UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+        
+        media_file = await attach_media(alert["id"], part, upload_id, file.filename)
+        return {"success": True, "media_file": media_file, "size": size, "sha256": digest.hexdigest()}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"SOS media upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to upload media")
+    finally:
+        # Gone already if attach_media moved it into place
+        await remove_part(part)
+
 # User Profile Routes
 @api_router.get("/profile")
 async def get_profile(current_user: dict = Depends(get_current_user)):
@@ -443,10 +2207,13 @@ async def update_profile(
     profile_data: dict,
     current_user: dict = Depends(get_current_user)
 ):
+    role = profile_data.get("role", current_user.get("role"))
+    if role in PRIVILEGED_ROLES and role != current_user.get("role"):
+        raise HTTPException(status_code=403, detail="This role can't be self-assigned")
     try:
         # Update user profile
         update_data = {
-            "role": profile_data.get("role", current_user.get("role")),
+            "role": role,
             "language": profile_data.get("language", current_user.get("language")),
             "location": profile_data.get("location"),
             "updated_at": datetime.utcnow()
@@ -456,6 +2223,7 @@ async def update_profile(
             {"id": current_user["id"]},
             {"$set": update_data}
         )
+        await invalidate_user(current_user["id"])
         
         return {"success": True, "message": "Profile updated successfully"}
         
@@ -478,6 +2246,7 @@ async def add_trusted_contact(
             {"id": current_user["id"]},
             {"$push": {"trusted_contacts": contact}}
         )
+        await invalidate_user(current_user["id"])
         
         return {"success": True, "message": "Trusted contact added successfully"}
         
@@ -486,26 +2255,106 @@ async def add_trusted_contact(
         raise HTTPException(status_code=500, detail="Failed to add trusted contact")
 
 # Employment Routes
+async def list_jobs(
+    limit: int,
+    skip: int = 0,
+    after: Optional[dict] = None,
+    location: Optional[str] = None,
+    origin: Optional[tuple] = None,
+    radius_km: float = JOBS_NEAR_DEFAULT_RADIUS_KM
+) -> tuple:
+    """Fetch one page of job postings and return (jobs, next_cursor)"""
+    query = {"is_women_friendly": True}
+    if location:
+        query.update(job_place_filter(location))
+    
+    if origin:
+        # Index-driven radius search, nearest first
+        lat, lng = origin
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "distanceField": "distance_km",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "query": query,
+                "spherical": True
+            }},
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$project": {**JOB_LIST_PROJECTION, "distance_km": 1}}
+        ]
+        return await db.job_postings.aggregate(pipeline).to_list(limit), None
+    
+    return await fetch_page(db.job_postings, query, limit, after, skip, JOB_LIST_PROJECTION)
+
+def facet_counts(field: str) -> List[dict]:
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": JOB_SEARCH_FACET_LIMIT},
+        {"$project": {"_id": 0, "value": "$_id", "count": 1}}
+    ]
+
+async def search_jobs(text: str, limit: int, skip: int = 0, location: Optional[str] = None) -> dict:
+    """Relevance-ranked text search plus location and salary facets, in one aggregation"""
+    match = {"$text": {"$search": text}, "is_women_friendly": True}
+    if location:
+        match.update(job_place_filter(location))
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$facet": {
+            "jobs": [
+                {"$sort": {"score": -1, "created_at": -1, "id": -1}},
+                {"$skip": skip},
+                {"$limit": limit},
+                {"$project": {**JOB_LIST_PROJECTION, "score": 1}}
+            ],
+            "locations": facet_counts("city_norm"),
+            "salary_ranges": facet_counts("salary_range"),
+            "total": [{"$count": "count"}]
+        }}
+    ]
+    result = (await db.job_postings.aggregate(pipeline).to_list(1))[0]
+    return {
+        "jobs": result["jobs"],
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "facets": {"locations": result["locations"], "salary_ranges": result["salary_ranges"]}
+    }
+
 @api_router.get("/jobs")
 async def get_jobs(
     skip: int = 0,
     limit: int = 20,
     location: Optional[str] = None,
+    near: Optional[str] = None,
+    radius_km: float = JOBS_NEAR_DEFAULT_RADIUS_KM,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
+    """List job postings.
+
+    With `q`, runs a relevance-ranked text search over title, requirements,
+    company and description instead, paginated with skip and returned with
+    `total` and location/salary `facets`.
+    """
+    origin = parse_lat_lng(near) if near else None
+    radius_km = max(0.1, min(radius_km, JOBS_NEAR_MAX_RADIUS_KM))
+    limit = max(1, min(limit, 100))
+    after = decode_cursor(cursor) if cursor else None
+    text = q.strip() if q else None
+    if text and (origin or after):
+        raise HTTPException(status_code=400, detail="q can't be combined with near or cursor")
     try:
-        query = {"is_women_friendly": True}
-        if location:
-            query["location"] = {"$regex": location, "$options": "i"}
-            
-        jobs = await db.job_postings.find(query).skip(skip).limit(limit).to_list(limit)
+        if text:
+            results = await search_jobs(text, limit, max(0, skip), location)
+            return FastJSONResponse({"success": True, **results, "next_cursor": None})
         
-        # Convert ObjectId to string for JSON serialization
-        for job in jobs:
-            if "_id" in job:
-                job["_id"] = str(job["_id"])
+        jobs, next_cursor = await list_jobs(limit, skip, after, location, origin, radius_km)
         
-        return {"success": True, "jobs": jobs}
+        return FastJSONResponse({"success": True, "jobs": jobs, "next_cursor": next_cursor})
         
     except Exception as e:
         logger.error(f"Get jobs error: {str(e)}")
@@ -523,6 +2372,7 @@ async def create_job(
             raise HTTPException(status_code=403, detail="Not authorized to create job postings")
             
         job = job_data.dict()
+        job.update(job_location_fields(job))
         job["created_by"] = current_user["id"]
         
         await db.job_postings.insert_one(job)
@@ -533,22 +2383,164 @@ async def create_job(
         logger.error(f"Create job error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create job posting")
 
+# Bulk job import
+async def iter_ndjson_lines(request: Request):
+    """Yield (line_number, raw_line) from a streamed NDJSON body; oversized lines come back as None"""
+    buffer = b""
+    line_number = 0
+    oversized = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, None if oversized or len(line) > JOBS_IMPORT_MAX_LINE_BYTES else line
+            oversized = False
+        if len(buffer) > JOBS_IMPORT_MAX_LINE_BYTES:
+            # Drop the rest of this line as it streams in
+            buffer = b""
+            oversized = True
+    if buffer or oversized:
+        yield line_number + 1, None if oversized else buffer
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'line'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+def job_import_operation(job_data: JobPosting, user_id: str):
+    """Insert a new posting, or upsert it when the partner supplied an external_id"""
+    job = job_data.dict()
+    job.update(job_location_fields(job))
+    job["created_by"] = user_id
+    if not job.get("external_id"):
+        return InsertOne(job)
+    insert_only = {"id": job.pop("id"), "created_at": job.pop("created_at")}
+    update = {"$set": job, "$setOnInsert": insert_only}
+    if "geo" not in job:
+        update["$unset"] = {"geo": ""}
+    return UpdateOne({"created_by": user_id, "external_id": job["external_id"]}, update, upsert=True)
+
+class JobImport:
+    """Accumulates validated lines and writes them in unordered bulk batches"""
+
+    def __init__(self, user_id: str, batch_size: int):
+        self.user_id = user_id
+        self.batch_size = max(1, batch_size)
+        self._operations: List = []
+        self._line_numbers: List[int] = []
+        self._external_ids: set = set()
+        self.received = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < JOBS_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    async def add(self, line_number: int, raw: Optional[bytes]):
+        if raw is not None and not raw.strip():
+            return
+        self.received += 1
+        if raw is None:
+            self.error(line_number, f"Line exceeds {JOBS_IMPORT_MAX_LINE_BYTES} bytes")
+            return
+        try:
+            job_data = JobPosting(**json.loads(raw))
+        except ValidationError as e:
+            self.error(line_number, validation_message(e))
+            return
+        except (ValueError, TypeError):
+            self.error(line_number, "Line is not a JSON object")
+            return
+        # A repeated external_id in one batch would race its own upsert
+        if job_data.external_id in self._external_ids:
+            await self.flush()
+        if job_data.external_id:
+            self._external_ids.add(job_data.external_id)
+        self._operations.append(job_import_operation(job_data, self.user_id))
+        self._line_numbers.append(line_number)
+        if len(self._operations) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        operations, line_numbers = self._operations, self._line_numbers
+        self._operations, self._line_numbers, self._external_ids = [], [], set()
+        if not operations:
+            return
+        try:
+            result = (await db.job_postings.bulk_write(operations, ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            result = e.details
+            for write_error in result.get("writeErrors", []):
+                self.error(line_numbers[write_error["index"]], write_error.get("errmsg", "Write failed"))
+        self.created += result.get("nInserted", 0) + result.get("nUpserted", 0)
+        self.updated += result.get("nMatched", 0)
+
+    def report(self) -> dict:
+        return {
+            "success": True,
+            "received": self.received,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+@api_router.post("/jobs/import")
+async def import_jobs(request: Request, current_user: dict = Depends(get_current_user)):
+    """Bulk-create job postings from an NDJSON body, one JobPosting per line.
+
+    Lines carrying an external_id upsert the partner's existing posting
+    instead of duplicating it. Bad lines are reported and skipped.
+    """
+    if current_user.get("role") not in ('admin', 'ngoPartner'):
+        raise HTTPException(status_code=403, detail="Only admins and NGO partners can import job postings")
+    job_import = JobImport(current_user["id"], JOBS_IMPORT_BATCH_SIZE)
+    try:
+        async for line_number, raw in iter_ndjson_lines(request):
+            await job_import.add(line_number, raw)
+        await job_import.flush()
+        logger.info(
+            f"Job import by {current_user['id']}: {job_import.created} created, "
+            f"{job_import.updated} updated, {job_import.failed} failed"
+        )
+        return job_import.report()
+        
+    except Exception as e:
+        logger.error(f"Import jobs error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import job postings")
+
 # Community Routes
+async def list_community_posts(limit: int, skip: int = 0, after: Optional[dict] = None) -> tuple:
+    """Fetch one page of posts and return (posts, next_cursor)"""
+    # First page comes from the hot feed cache; older pages go to Mongo
+    page = None
+    if after is None and skip == 0:
+        page = await feed_cache.first_page(limit)
+    if page is None:
+        page = await fetch_page(db.community_posts, {}, limit, after, skip, POST_LIST_PROJECTION)
+    posts, next_cursor = page
+    return post_counters.apply_pending(posts), next_cursor
+
 @api_router.get("/community/posts")
 async def get_community_posts(
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
+    limit = max(1, min(limit, 100))
+    after = decode_cursor(cursor) if cursor else None
     try:
-        posts = await db.community_posts.find({}).skip(skip).limit(limit).sort("created_at", -1).to_list(limit)
-        
-        # Convert ObjectId to string for JSON serialization
-        for post in posts:
-            if "_id" in post:
-                post["_id"] = str(post["_id"])
+        posts, next_cursor = await list_community_posts(limit, skip, after)
         
-        return {"success": True, "posts": posts}
+        return FastJSONResponse({"success": True, "posts": posts, "next_cursor": next_cursor})
         
     except Exception as e:
         logger.error(f"Get community posts error: {str(e)}")
@@ -568,7 +2560,14 @@ async def create_community_post(
             is_anonymous=post_data.get("is_anonymous", False)
         )
         
-        await db.community_posts.insert_one(post.dict())
+        post_dict = post.dict()
+        # Mongo keeps millisecond precision; match it so cached cursors line up
+        post_dict["created_at"] = post_dict["created_at"].replace(
+            microsecond=post_dict["created_at"].microsecond // 1000 * 1000
+        )
+        await db.community_posts.insert_one(post_dict)
+        # Other processes add the post to their own feed caches
+        await cache_invalidations.publish("feed", post_dict["id"], feed_cache.add(post_dict))
         
         return {"success": True, "message": "Post created successfully"}
         
@@ -576,41 +2575,586 @@ async def create_community_post(
         logger.error(f"Create community post error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create post")
 
+# Post counters
+class CounterBuffer:
+    """Coalesces likes_count/comments_count increments in memory.
+
+    Deltas accumulate per post and are written as one bulk_write of $inc
+    updates every flush_seconds, so a viral post takes one write per flush
+    instead of one per like.
+    """
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._pending: Dict[str, Dict[str, int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self.increments = 0
+        self.writes = 0
+
+    def add(self, post_id: str, field: str, delta: int):
+        fields = self._pending.setdefault(post_id, {})
+        fields[field] = fields.get(field, 0) + delta
+        self.increments += 1
+
+    def apply_pending(self, posts: List[dict]) -> List[dict]:
+        """Overlay unflushed deltas on posts read from Mongo or the feed cache"""
+        if not self._pending:
+            return posts
+        for post in posts:
+            for field, delta in self._pending.get(post.get("id"), {}).items():
+                post[field] = post.get(field, 0) + delta
+        return posts
+
+    async def flush(self):
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            pending = {
+                post_id: {field: delta for field, delta in fields.items() if delta}
+                for post_id, fields in pending.items()
+            }
+            pending = {post_id: fields for post_id, fields in pending.items() if fields}
+            if not pending:
+                return
+            try:
+                await db.community_posts.bulk_write([
+                    UpdateOne({"id": post_id}, {"$inc": fields})
+                    for post_id, fields in pending.items()
+                ], ordered=False)
+                self.writes += len(pending)
+                feed_cache.apply_deltas(pending)
+            except Exception as e:
+                logger.error(f"Counter flush for {len(pending)} post(s) failed: {str(e)}")
+                # Put the deltas back so they're retried on the next flush
+                for post_id, fields in pending.items():
+                    for field, delta in fields.items():
+                        self.add(post_id, field, delta)
+
+    async def run(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {"pending_posts": len(self._pending), "increments": self.increments, "writes": self.writes}
+
+post_counters = CounterBuffer(COUNTER_FLUSH_SECONDS)
+
+async def ensure_post_exists(post_id: str):
+    if await db.community_posts.find_one({"id": post_id}, {"_id": 0, "id": 1}) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+@api_router.post("/community/posts/{post_id}/like")
+async def like_post(post_id: str, current_user: dict = Depends(get_current_user)):
+    """Like a post; liking twice is a no-op"""
+    await ensure_post_exists(post_id)
+    try:
+        try:
+            await db.post_likes.insert_one({
+                "post_id": post_id,
+                "user_id": current_user["id"],
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            return {"success": True, "liked": True, "message": "Post already liked"}
+        
+        post_counters.add(post_id, "likes_count", 1)
+        return {"success": True, "liked": True, "message": "Post liked"}
+        
+    except Exception as e:
+        logger.error(f"Like post error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to like post")
+
+@api_router.delete("/community/posts/{post_id}/like")
+async def unlike_post(post_id: str, current_user: dict = Depends(get_current_user)):
+    try:
+        result = await db.post_likes.delete_one({"post_id": post_id, "user_id": current_user["id"]})
+        if result.deleted_count:
+            post_counters.add(post_id, "likes_count", -1)
+        
+        return {"success": True, "liked": False, "message": "Post unliked"}
+        
+    except Exception as e:
+        logger.error(f"Unlike post error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to unlike post")
+
+@api_router.post("/community/posts/{post_id}/comments")
+async def add_comment(
+    post_id: str,
+    comment_data: CommentCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    await ensure_post_exists(post_id)
+    try:
+        now = datetime.utcnow()
+        comment = {
+            "id": str(uuid.uuid4()),
+            "post_id": post_id,
+            "user_id": current_user["id"],
+            "content": comment_data.content,
+            "is_anonymous": comment_data.is_anonymous,
+            "created_at": now.replace(microsecond=now.microsecond // 1000 * 1000)
+        }
+        await db.post_comments.insert_one(comment)
+        post_counters.add(post_id, "comments_count", 1)
+        
+        return {"success": True, "message": "Comment added successfully", "comment_id": comment["id"]}
+        
+    except Exception as e:
+        logger.error(f"Add comment error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to add comment")
+
+@api_router.get("/community/posts/{post_id}/comments")
+async def get_comments(
+    post_id: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    limit = max(1, min(limit, 100))
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        comments, next_cursor = await fetch_page(
+            db.post_comments, {"post_id": post_id}, limit, after, projection={"_id": 0}
+        )
+        return FastJSONResponse({"success": True, "comments": comments, "next_cursor": next_cursor})
+        
+    except Exception as e:
+        logger.error(f"Get comments error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch comments")
+
+# Polls
+# Votes are recorded once per user in poll_votes (unique index) and tallied in
+# POLL_TALLY_SHARDS counter documents per poll, picked at random per vote, so
+# concurrent votes on a hot poll don't all contend on one document.
+poll_tally_cache: Dict[str, tuple] = {}
+
+async def get_poll_tallies(poll_ids: List[str]) -> Dict[str, dict]:
+    """Sum each poll's shard documents, cached for POLL_TALLY_CACHE_SECONDS"""
+    now = time.monotonic()
+    tallies = {}
+    missing = []
+    for poll_id in poll_ids:
+        cached = poll_tally_cache.get(poll_id)
+        if cached and cached[0] > now:
+            tallies[poll_id] = cached[1]
+        else:
+            missing.append(poll_id)
+    if missing:
+        if len(poll_tally_cache) > 10000:
+            for poll_id in [k for k, v in poll_tally_cache.items() if v[0] <= now]:
+                del poll_tally_cache[poll_id]
+        fresh = {poll_id: {"counts": {}, "total": 0} for poll_id in missing}
+        async for shard in db.poll_tallies.find({"poll_id": {"$in": missing}}, {"_id": 0}):
+            tally = fresh[shard["poll_id"]]
+            for option, count in shard.get("counts", {}).items():
+                tally["counts"][option] = tally["counts"].get(option, 0) + count
+            tally["total"] += shard.get("total", 0)
+        for poll_id, tally in fresh.items():
+            poll_tally_cache[poll_id] = (now + POLL_TALLY_CACHE_SECONDS, tally)
+        tallies.update(fresh)
+    return tallies
+
+def render_poll(poll: dict, tally: dict, user_vote: Optional[int]) -> dict:
+    return {
+        "id": poll["id"],
+        "question": poll["question"],
+        "options": [
+            {"text": option["text"], "votes": tally["counts"].get(str(index), 0)}
+            for index, option in enumerate(poll["options"])
+        ],
+        "total_votes": tally["total"],
+        "end_date": poll.get("end_date"),
+        "created_at": poll["created_at"],
+        "user_voted": user_vote is not None,
+        "user_vote_index": user_vote
+    }
+
+async def list_polls(limit: int = 20, user_id: Optional[str] = None) -> List[dict]:
+    polls = await db.polls.find({}, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+    poll_ids = [poll["id"] for poll in polls]
+    tallies, votes = await asyncio.gather(
+        get_poll_tallies(poll_ids),
+        db.poll_votes.find(
+            {"poll_id": {"$in": poll_ids}, "user_id": user_id},
+            {"_id": 0, "poll_id": 1, "option_index": 1}
+        ).to_list(None) if user_id else asyncio.sleep(0, result=[])
+    )
+    user_votes = {vote["poll_id"]: vote["option_index"] for vote in votes}
+    return [render_poll(poll, tallies[poll["id"]], user_votes.get(poll["id"])) for poll in polls]
+
+@api_router.get("/community/polls")
+async def get_polls(limit: int = 20, current_user: dict = Depends(get_current_user)):
+    limit = max(1, min(limit, 100))
+    try:
+        polls = await list_polls(limit, current_user["id"])
+        return FastJSONResponse({"success": True, "polls": polls})
+        
+    except Exception as e:
+        logger.error(f"Get polls error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch polls")
+
+@api_router.post("/community/polls")
+async def create_poll(poll_data: PollCreate, current_user: dict = Depends(get_current_user)):
+    try:
+        now = datetime.utcnow()
+        poll = {
+            "id": str(uuid.uuid4()),
+            "question": poll_data.question,
+            "options": [{"text": option.text} for option in poll_data.options],
+            "end_date": poll_data.end_date,
+            "created_by": current_user["id"],
+            "created_at": now
+        }
+        await db.polls.insert_one(poll)
+        
+        return {"success": True, "message": "Poll created successfully", "poll_id": poll["id"]}
+        
+    except Exception as e:
+        logger.error(f"Create poll error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create poll")
+
+@api_router.post("/community/polls/{poll_id}/vote")
+async def vote_in_poll(
+    poll_id: str,
+    vote_data: PollVote,
+    current_user: dict = Depends(get_current_user)
+):
+    poll = await db.polls.find_one({"id": poll_id}, {"_id": 0, "options": 1, "end_date": 1})
+    if poll is None:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    if vote_data.option_index >= len(poll["options"]):
+        raise HTTPException(status_code=400, detail="Invalid option")
+    if poll.get("end_date") and poll["end_date"] < datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Poll has ended")
+    
+    vote = {"poll_id": poll_id, "user_id": current_user["id"]}
+    try:
+        await db.poll_votes.insert_one({
+            **vote,
+            "option_index": vote_data.option_index,
+            "created_at": datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Already voted in this poll")
+    except Exception as e:
+        logger.error(f"Poll vote error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to record vote")
+    
+    try:
+        option = str(vote_data.option_index)
+        try:
+            await db.poll_tallies.update_one(
+                {"poll_id": poll_id, "shard": random.randrange(max(1, POLL_TALLY_SHARDS))},
+                {"$inc": {f"counts.{option}": 1, "total": 1}},
+                upsert=True
+            )
+        except Exception:
+            # Withdraw the membership row so the uncounted vote can be retried
+            try:
+                await db.poll_votes.delete_one(vote)
+            except Exception as e:
+                logger.error(f"Could not withdraw uncounted vote on poll {poll_id}: {str(e)}")
+            raise
+        # Keep the cached tally in step with this process's own votes
+        cached = poll_tally_cache.get(poll_id)
+        if cached:
+            cached[1]["counts"][option] = cached[1]["counts"].get(option, 0) + 1
+            cached[1]["total"] += 1
+        
+        return {"success": True, "message": "Vote recorded"}
+        
+    except Exception as e:
+        logger.error(f"Poll vote error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to record vote")
+
+# Screen bootstrap Routes
+async def gather_sections(sections: dict) -> dict:
+    """Run named queries concurrently; a failed section is reported, not fatal"""
+    names = list(sections)
+    results = await asyncio.gather(*sections.values(), return_exceptions=True)
+    payload = {"success": True, "errors": {}}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Bootstrap section {name} failed: {str(result)}")
+            payload[name] = None
+            payload["errors"][name] = "Failed to load"
+        else:
+            payload[name] = result
+    return payload
+
+@api_router.get("/screens/community")
+async def bootstrap_community_screen(
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    """Posts and polls for the community tab in one round trip"""
+    limit = max(1, min(limit, 100))
+    
+    async def posts_section():
+        posts, next_cursor = await list_community_posts(limit)
+        return {"items": posts, "next_cursor": next_cursor}
+    
+    payload = await gather_sections({
+        "posts": posts_section(),
+        "polls": list_polls(limit, current_user["id"])
+    })
+    return FastJSONResponse(payload)
+
+@api_router.get("/screens/employment")
+async def bootstrap_employment_screen(
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    """Jobs for the employment tab, paged like GET /jobs"""
+    limit = max(1, min(limit, 100))
+    
+    async def jobs_section():
+        jobs, next_cursor = await list_jobs(limit)
+        return {"items": jobs, "next_cursor": next_cursor}
+    
+    payload = await gather_sections({
+        "jobs": jobs_section()
+    })
+    return FastJSONResponse(payload)
+
+# Welfare schemes catalogue
+# Static data, encoded once at import. Bump the version whenever it changes.
+WELFARE_SCHEMES_VERSION = "2025-01"
+WELFARE_SCHEMES = [
+    {
+        "id": "1",
+        "name": "महिला सशक्तीकरण योजना",
+        "name_en": "Women Empowerment Scheme",
+        "description": "महिलांसाठी विशेष आर्थिक सहाय्य योजना",
+        "description_en": "Special financial assistance scheme for women",
+        "eligibility": ["महिला असणे आवश्यक", "वय 18-60 वर्षे", "कुटुंबाचे उत्पन्न ₹3 लाखापेक्षा कमी"],
+        "benefits": ["₹50,000 आर्थिक सहाय्य", "कौशल्य विकास प्रशिक्षण", "रोजगार सहाय्य"],
+        "application_process": "ऑनलाइन अर्ज करा",
+        "documents_required": ["आधार कार्ड", "उत्पन्न प्रमाणपत्र", "बँक पासबुक"]
+    },
+    {
+        "id": "2",
+        "name": "बेटी बचाओ बेटी पढाओ",
+        "name_en": "Beti Bachao Beti Padhao",
+        "description": "मुलींच्या शिक्षणासाठी विशेष योजना",
+        "description_en": "Special scheme for girls' education",
+        "eligibility": ["मुलगी असणे आवश्यक", "शैक्षणिक संस्थेत प्रवेश", "कुटुंबाचे उत्पन्न मर्यादेत"],
+        "benefits": ["शिक्षण शुल्क माफी", "पुस्तके आणि गणवेश", "मासिक शिष्यवृत्ती"],
+        "application_process": "शाळा/महाविद्यालयात अर्ज करा",
+        "documents_required": ["जन्म प्रमाणपत्र", "शैक्षणिक प्रमाणपत्रे", "उत्पन्न प्रमाणपत्र"]
+    }
+]
+
+WELFARE_SCHEME_LANGUAGES = ("mr", "en")
+
+def project_scheme(scheme: dict, lang: Optional[str]) -> dict:
+    """Full record for lang=None, otherwise one language with `_en` fields folded in"""
+    if lang is None:
+        return scheme
+    projected = {k: v for k, v in scheme.items() if not k.endswith("_en")}
+    if lang == "en":
+        for key in projected:
+            if f"{key}_en" in scheme:
+                projected[key] = scheme[f"{key}_en"]
+    return projected
+
+def encode_scheme_response(lang: Optional[str]) -> tuple:
+    """Pre-encode the catalogue for one language and derive its strong ETag"""
+    payload = {
+        "success": True,
+        "version": WELFARE_SCHEMES_VERSION,
+        "schemes": [project_scheme(scheme, lang) for scheme in WELFARE_SCHEMES]
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
+
+welfare_scheme_responses = {
+    lang: encode_scheme_response(lang) for lang in (None,) + WELFARE_SCHEME_LANGUAGES
+}
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
 # Welfare Schemes Routes
 @api_router.get("/welfare-schemes")
-async def get_welfare_schemes(current_user: dict = Depends(get_current_user)):
+async def get_welfare_schemes(
+    request: Request,
+    lang: Optional[str] = None,
+    user_id: str = Depends(verify_token)
+):
+    if lang is not None and lang not in WELFARE_SCHEME_LANGUAGES:
+        raise HTTPException(status_code=400, detail="lang must be 'mr' or 'en'")
     try:
-        schemes = [
-            {
-                "id": "1",
-                "name": "महिला सशक्तीकरण योजना",
-                "name_en": "Women Empowerment Scheme",
-                "description": "महिलांसाठी विशेष आर्थिक सहाय्य योजना",
-                "description_en": "Special financial assistance scheme for women",
-                "eligibility": ["महिला असणे आवश्यक", "वय 18-60 वर्षे", "कुटुंबाचे उत्पन्न ₹3 लाखापेक्षा कमी"],
-                "benefits": ["₹50,000 आर्थिक सहाय्य", "कौशल्य विकास प्रशिक्षण", "रोजगार सहाय्य"],
-                "application_process": "ऑनलाइन अर्ज करा",
-                "documents_required": ["आधार कार्ड", "उत्पन्न प्रमाणपत्र", "बँक पासबुक"]
-            },
-            {
-                "id": "2", 
-                "name": "बेटी बचाओ बेटी पढाओ",
-                "name_en": "Beti Bachao Beti Padhao",
-                "description": "मुलींच्या शिक्षणासाठी विशेष योजना",
-                "description_en": "Special scheme for girls' education",
-                "eligibility": ["मुलगी असणे आवश्यक", "शैक्षणिक संस्थेत प्रवेश", "कुटुंबाचे उत्पन्न मर्यादेत"],
-                "benefits": ["शिक्षण शुल्क माफी", "पुस्तके आणि गणवेश", "मासिक शिष्यवृत्ती"],
-                "application_process": "शाळा/महाविद्यालयात अर्ज करा",
-                "documents_required": ["जन्म प्रमाणपत्र", "शैक्षणिक प्रमाणपत्रे", "उत्पन्न प्रमाणपत्र"]
-            }
-        ]
-        
-        return {"success": True, "schemes": schemes}
+        body, etag = welfare_scheme_responses[lang]
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except Exception as e:
         logger.error(f"Get welfare schemes error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch welfare schemes")
 
+# Admin exports
+# Streamed straight from a Motor cursor, one batch at a time, so memory stays
+# flat however many rows match. No sort is applied: with a date range the
+# query walks the date index and rows come back in date order.
+SOS_ALERT_STATUSES = ("active", "resolved", "false_alarm")
+JOB_STATUSES = ("open", "expired")
+SOS_ALERT_EXPORT_COLUMNS = [
+    "id", "user_id", "timestamp", "status", "is_stealth", "location.latitude", "location.longitude",
+    "location.address", "resolved_at", "time_to_last_notification_ms", "contacts_notified", "media_files"
+]
+JOB_EXPORT_COLUMNS = [
+    "id", "external_id", "title", "company", "location", "city", "district", "salary_range",
+    "is_women_friendly", "latitude", "longitude", "requirements", "description",
+    "application_deadline", "created_by", "created_at"
+]
+
+def export_projection(columns: List[str]) -> dict:
+    """Only the exported columns leave the database, for NDJSON as well as CSV"""
+    return {"_id": 0, **{column: 1 for column in columns}}
+
+def parse_export_format(format: str) -> str:
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return format
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored dates are naive UTC; bring offset-aware query bounds in line"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def date_range_query(field: str, start: Optional[datetime], end: Optional[datetime]) -> dict:
+    """Half-open [start, end) filter on a date field"""
+    start, end = naive_utc(start), naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+def csv_cell(doc: dict, column: str) -> str:
+    value = doc
+    for part in column.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=json_default)
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        # Keep spreadsheet apps from evaluating user-supplied text as a formula
+        return "'" + value
+    return str(value)
+
+async def stream_export(cursor, format: str, columns: List[str], label: str):
+    """Encode cursor documents as NDJSON or CSV, yielding about EXPORT_CHUNK_BYTES at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(columns)
+    rows = 0
+    try:
+        async for doc in cursor:
+            if format == "csv":
+                writer.writerow([csv_cell(doc, column) for column in columns])
+            else:
+                buffer.write(json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=json_default))
+                buffer.write("\n")
+            rows += 1
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        logger.info(f"Exported {rows} {label} row(s) as {format}")
+    except Exception as e:
+        # Headers are already sent; abort so the client sees a truncated download
+        logger.error(f"Export of {label} failed after {rows} row(s): {str(e)}")
+        raise
+
+def export_response(cursor, format: str, columns: List[str], label: str) -> StreamingResponse:
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"{label}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(cursor, format, columns, label),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.get("/admin/export/sos-alerts")
+async def export_sos_alerts(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Full SOS alert history for audits, filtered by alert time and status"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can export SOS alerts")
+    format = parse_export_format(format)
+    if status and status not in SOS_ALERT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(SOS_ALERT_STATUSES)}")
+    query = date_range_query("timestamp", start, end)
+    if status:
+        query["status"] = status
+    try:
+        cursor = db.sos_alerts.find(query, export_projection(SOS_ALERT_EXPORT_COLUMNS)).batch_size(EXPORT_BATCH_SIZE)
+        return export_response(cursor, format, SOS_ALERT_EXPORT_COLUMNS, "sos-alerts")
+        
+    except Exception as e:
+        logger.error(f"Export SOS alerts error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to export SOS alerts")
+
+@api_router.get("/admin/export/jobs")
+async def export_jobs(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Job postings by creation time; status is open/expired by application deadline.
+
+    Admins export every posting, NGO partners the ones they created.
+    """
+    role = current_user.get("role")
+    if role not in ('admin', 'ngoPartner'):
+        raise HTTPException(status_code=403, detail="Only admins and NGO partners can export job postings")
+    format = parse_export_format(format)
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(JOB_STATUSES)}")
+    query = date_range_query("created_at", start, end)
+    if role != 'admin':
+        query["created_by"] = current_user["id"]
+    now = datetime.utcnow()
+    if status == "open":
+        query["$or"] = [{"application_deadline": None}, {"application_deadline": {"$gte": now}}]
+    elif status == "expired":
+        query["application_deadline"] = {"$lt": now}
+    try:
+        cursor = db.job_postings.find(query, export_projection(JOB_EXPORT_COLUMNS))
+        return export_response(cursor.batch_size(EXPORT_BATCH_SIZE), format, JOB_EXPORT_COLUMNS, "jobs")
+        
+    except Exception as e:
+        logger.error(f"Export jobs error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to export job postings")
+
 # General routes
 @api_router.get("/")
 async def root():
@@ -618,7 +3162,37 @@ async def root():
 
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow(),
+        "user_cache": user_cache.stats(),
+        "feed_cache": feed_cache.stats(),
+        "location_stream": location_hub.stats(),
+        "post_counters": post_counters.stats(),
+        "cache_invalidations": cache_invalidations.stats(),
+        "admission": admission.stats(),
+        "process": PROCESS_ID
+    }
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus text metrics for this process"""
+    user_stats = user_cache.stats()
+    feed_stats = feed_cache.stats()
+    gauges = {
+        "aai_user_cache_hits": user_stats["hits"],
+        "aai_user_cache_misses": user_stats["misses"],
+        "aai_feed_cache_hits": feed_stats["hits"],
+        "aai_feed_cache_misses": feed_stats["misses"],
+        "aai_otp_queue_depth": otp_queue.qsize() if otp_queue is not None else 0,
+        "aai_location_points_buffered": location_hub.stats()["buffered"],
+        "aai_post_counters_pending": post_counters.stats()["pending_posts"]
+    }
+    admission_stats = admission.stats()
+    for priority in ("standard", "low"):
+        gauges[f"aai_admission_in_flight_{priority}"] = admission_stats["in_flight"][priority]
+        gauges[f"aai_admission_shed_{priority}"] = admission_stats["shed"][priority]
+    return Response(content=metrics.render(gauges), media_type="text/plain; version=0.0.4")
 
 # Include the router
 app.include_router(api_router)
@@ -629,31 +3203,273 @@ async def global_exception_handler(request, exc):
     logger.error(f"Global exception: {str(exc)}")
     return {"error": "Internal server error", "detail": str(exc)}
 
+# Database indexes
+# Declarative registry: collection -> index specs. Each spec holds the key list
+# plus create_index options; names follow MongoDB's default "<field>_<dir>" form.
+INDEX_REGISTRY = {
+    "users": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("phone", 1)], "unique": True, "sparse": True},
+        {"keys": [("email", 1)], "unique": True, "sparse": True},
+    ],
+    "otps": [
+        {"keys": [("expires_at", 1)], "expireAfterSeconds": 0},
+        {"keys": [("identifier", 1), ("method", 1), ("otp_hash", 1)]},
+    ],
+    "sos_alerts": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("user_id", 1), ("timestamp", -1)]},
+        {"keys": [("timestamp", 1)]},
+        {"keys": [("delivery.status", 1), ("delivery.next_attempt_at", 1)]},
+    ],
+    "post_likes": [
+        {"keys": [("post_id", 1), ("user_id", 1)], "unique": True},
+    ],
+    "post_comments": [
+        {"keys": [("post_id", 1), ("created_at", -1), ("id", -1)]},
+    ],
+    "polls": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("created_at", -1)]},
+    ],
+    "poll_votes": [
+        {"keys": [("poll_id", 1), ("user_id", 1)], "unique": True},
+    ],
+    "poll_tallies": [
+        {"keys": [("poll_id", 1), ("shard", 1)], "unique": True},
+    ],
+    "media_uploads": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("user_id", 1), ("status", 1)]},
+        # Abandoned sessions expire; completed ones are kept
+        {"keys": [("updated_at", 1)], "expireAfterSeconds": MEDIA_UPLOAD_SESSION_TTL_SECONDS,
+         "partialFilterExpression": {"status": "uploading"}},
+    ],
+    "responders": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("is_active", 1)]},
+    ],
+    "sos_locations": [
+        {"keys": [("meta.alert_id", 1), ("ts", 1)]},
+        {"keys": [("meta.alert_id", 1), ("received_at", 1)]},
+    ],
+    "rate_limits": [
+        {"keys": [("expires_at", 1)], "expireAfterSeconds": 0},
+    ],
+    "cache_invalidations": [
+        {"keys": [("at", 1)], "expireAfterSeconds": 3600},
+    ],
+    "job_postings": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("is_women_friendly", 1), ("created_at", -1), ("id", -1)]},
+        {"keys": [("geo", "2dsphere")]},
+        {"keys": [("city_norm", 1), ("is_women_friendly", 1), ("created_at", -1), ("id", -1)]},
+        {"keys": [("district_norm", 1), ("is_women_friendly", 1), ("created_at", -1), ("id", -1)]},
+        {
+            "keys": [("created_by", 1), ("external_id", 1)],
+            "unique": True,
+            "partialFilterExpression": {"external_id": {"$type": "string"}}
+        },
+        # MongoDB has no Marathi analyzer. The english one splits Devanagari on
+        # the same Unicode word boundaries and its stemmer and stop words only
+        # touch Latin script, so Marathi terms are indexed verbatim.
+        {
+            "keys": [("title", "text"), ("requirements", "text"), ("company", "text"), ("description", "text")],
+            "name": "job_search_text",
+            "weights": {"title": 10, "requirements": 5, "company": 3, "description": 1},
+            "default_language": "english"
+        },
+    ],
+    "community_posts": [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("created_at", -1), ("id", -1)]},
+    ],
+}
+
+# Options that make two indexes on the same keys different
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+def index_name(keys: List[tuple]) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+# Text index settings as the server reports them, with its defaults
+TEXT_INDEX_DEFAULTS = {"default_language": "english", "language_override": "language"}
+
+def index_key_pattern(keys: List[tuple]) -> List[tuple]:
+    """Key pattern as list_indexes() reports it; text fields collapse into _fts/_ftsx"""
+    pattern = []
+    for field, direction in keys:
+        if direction != "text":
+            pattern.append((field, direction))
+        elif ("_fts", "text") not in pattern:
+            pattern += [("_fts", "text"), ("_ftsx", 1)]
+    return pattern
+
+def index_matches(existing: dict, keys: List[tuple], options: dict) -> bool:
+    """Compare an index from list_indexes() with a registry spec"""
+    if list(existing["key"].items()) != index_key_pattern(keys):
+        return False
+    text_fields = [field for field, direction in keys if direction == "text"]
+    if text_fields:
+        weights = {field: 1 for field in text_fields}
+        weights.update(options.get("weights", {}))
+        if existing.get("weights") != weights:
+            return False
+        for option, default in TEXT_INDEX_DEFAULTS.items():
+            if existing.get(option, default) != options.get(option, default):
+                return False
+    for option in INDEX_OPTIONS:
+        current, wanted = existing.get(option), options.get(option)
+        if option in ("unique", "sparse"):
+            current, wanted = bool(current), bool(wanted)
+        if current != wanted:
+            return False
+    return True
+
+async def reconcile_indexes(registry: dict = INDEX_REGISTRY) -> dict:
+    """Build only the indexes that are missing or whose definition changed"""
+    summary = {"created": [], "rebuilt": [], "unchanged": 0, "failed": []}
+    started = time.perf_counter()
+    for collection_name, specs in registry.items():
+        collection = db[collection_name]
+        try:
+            existing = {index["name"]: index async for index in collection.list_indexes()}
+        except Exception as e:
+            logger.error(f"Could not list indexes on {collection_name}: {str(e)}")
+            summary["failed"].append(collection_name)
+            continue
+        
+        for spec in specs:
+            keys = spec["keys"]
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            name = options.setdefault("name", index_name(keys))
+            label = f"{collection_name}.{name}"
+            current = existing.get(name)
+            if current is not None and index_matches(current, keys, options):
+                summary["unchanged"] += 1
+                continue
+            try:
+                if current is not None:
+                    # Definition changed (e.g. an old non-sparse phone_1): rebuild it
+                    logger.warning(f"Index {label} differs from registry, rebuilding")
+                    await collection.drop_index(name)
+                    summary["rebuilt"].append(label)
+                else:
+                    summary["created"].append(label)
+                await collection.create_index(keys, background=True, **options)
+            except Exception as e:
+                logger.error(f"Failed to build index {label}: {str(e)}")
+                summary["failed"].append(label)
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Index reconciliation finished in {elapsed_ms:.0f}ms: "
+        f"{len(summary['created'])} created, {len(summary['rebuilt'])} rebuilt, "
+        f"{summary['unchanged']} unchanged, {len(summary['failed'])} failed"
+    )
+    return summary
+
+async def ensure_timeseries_collections():
+    """Create time-series collections before anything implicitly creates them"""
+    existing = await db.list_collection_names(filter={"name": "sos_locations"})
+    if existing:
+        return
+    try:
+        await db.create_collection(
+            "sos_locations",
+            timeseries={"timeField": "ts", "metaField": "meta", "granularity": "seconds"},
+            expireAfterSeconds=SOS_LOCATION_RETENTION_DAYS * 24 * 3600
+        )
+        logger.info("Created sos_locations time-series collection")
+    except CollectionInvalid:
+        pass
+
+async def run_database_maintenance():
+    """Index reconciliation and backfills, run by one process per deployment at a time"""
+    if not await acquire_lease("database-maintenance", DATABASE_MAINTENANCE_LEASE_SECONDS):
+        logger.info("Database maintenance is running in another process, skipping")
+        return
+    try:
+        await reconcile_indexes()
+        await backfill_job_locations()
+    finally:
+        await release_lease("database-maintenance")
+
+async def backfill_job_locations(batch_size: int = 500):
+    """Give postings created before geo search their normalized location fields"""
+    updated = 0
+    try:
+        cursor = db.job_postings.find(
+            {"city_norm": {"$exists": False}},
+            {"_id": 1, "location": 1, "city": 1, "district": 1, "latitude": 1, "longitude": 1}
+        ).batch_size(batch_size)
+        async for job in cursor:
+            await db.job_postings.update_one({"_id": job["_id"]}, {"$set": job_location_fields(job)})
+            updated += 1
+    except Exception as e:
+        logger.error(f"Job location backfill error: {str(e)}")
+    if updated:
+        logger.info(f"Backfilled location fields on {updated} job posting(s)")
+
 # Startup/shutdown events
+background_stop_event = asyncio.Event()
+outbox_workers: List[asyncio.Task] = []
+otp_workers: List[asyncio.Task] = []
+index_tasks: List[asyncio.Task] = []
+background_tasks: List[asyncio.Task] = []
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("aai Saheb API starting up...")
     
-    # Drop existing indexes that might not be sparse
+    connect_database()
+    await warm_database()
+    
+    # Every worker makes sure sos_locations exists as a time-series collection
+    # before its location hub can write, or the first insert_many would create
+    # it as a plain collection
     try:
-        await db.users.drop_index("phone_1")
-        await db.users.drop_index("email_1")
-        logger.info("Dropped existing indexes")
+        await ensure_timeseries_collections()
     except Exception as e:
-        logger.info(f"No existing indexes to drop: {e}")
+        logger.error(f"Time-series collection setup failed: {str(e)}")
     
-    # Create indexes for better performance
-    await db.users.create_index("phone", unique=True, sparse=True)
-    await db.users.create_index("email", unique=True, sparse=True)
-    await db.sos_alerts.create_index([("user_id", 1), ("timestamp", -1)])
-    await db.otps.create_index("expires_at", expireAfterSeconds=0)
+    # numpy is only needed by the responder index; load it now, off the loop,
+    # so the first SOS activation in this worker doesn't pay for the import
+    await asyncio.to_thread(importlib.import_module, "numpy")
     
-    logger.info("Database indexes created successfully")
+    # Reconcile indexes in the background so startup doesn't wait on builds
+    index_tasks.append(asyncio.create_task(run_database_maintenance()))
+    
+    # Embedded outbox workers keep single-process deployments delivering alerts
+    if SOS_OUTBOX_EMBEDDED_WORKERS > 0:
+        outbox_workers.extend(start_outbox_workers(SOS_OUTBOX_EMBEDDED_WORKERS, background_stop_event))
+    
+    otp_workers.extend(start_otp_delivery_workers(OTP_DELIVERY_WORKERS))
+    background_tasks.append(asyncio.create_task(location_hub.run(background_stop_event)))
+    background_tasks.append(asyncio.create_task(responder_index.run(background_stop_event)))
+    background_tasks.append(asyncio.create_task(post_counters.run(background_stop_event)))
+    background_tasks.append(asyncio.create_task(cache_invalidations.run(background_stop_event)))
+    background_tasks.append(asyncio.create_task(sample_event_loop_lag(background_stop_event)))
+    background_tasks.append(asyncio.create_task(run_upload_sweeper(background_stop_event)))
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("aai Saheb API shutting down...")
-    client.close()
+    background_stop_event.set()
+    for task in index_tasks:
+        task.cancel()
+    if outbox_workers or background_tasks:
+        await asyncio.gather(*outbox_workers, *background_tasks, return_exceptions=True)
+    if otp_queue is not None and not otp_queue.empty():
+        # Give in-flight OTPs a moment to go out before stopping the workers
+        try:
+            await asyncio.wait_for(otp_queue.join(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {otp_queue.qsize()} undelivered OTP(s) on shutdown")
+    for task in otp_workers:
+        task.cancel()
+    if client is not None:
+        client.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,40 @@
+"""
+Standalone SOS outbox worker for aai Saheb.
+
+Drains pending SOS alert deliveries independently of the API process. Run as
+many of these as needed (jobs are claimed atomically, so they scale across
+hosts) and set SOS_OUTBOX_EMBEDDED_WORKERS=0 on the API servers:
+
+    python sos_worker.py --workers 4
+"""
+
+import argparse
+import asyncio
+import signal
+
+import server
+from server import logger, start_outbox_workers
+
+
+async def run(workers: int):
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    server.connect_database()
+    tasks = start_outbox_workers(workers, stop_event)
+    logger.info(f"SOS worker process running {workers} outbox worker(s)")
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the SOS notification outbox")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent outbox workers in this process")
+    args = parser.parse_args()
+    asyncio.run(run(max(1, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Endpoint Benchmarks for aai Saheb - Women Empowerment Platform
+Boots server.app in-process against a local MongoDB (or an in-memory
+stand-in), drives each route at a fixed concurrency and reports
+p50/p95/p99 latency and throughput. With --baseline, the run fails when a
+route's p95 regresses past the stored value.
+
+    python backend_benchmark.py --in-memory --requests 500 --concurrency 20
+    python backend_benchmark.py --save-baseline benchmark_baseline.json
+    python backend_benchmark.py --baseline benchmark_baseline.json --tolerance 0.25
+    python backend_benchmark.py --in-memory --import-budget-ms 800
+
+Cold start is measured too: `import server` is timed in fresh interpreters and
+stored in the baseline. With --baseline, the run fails when the median import
+time exceeds the stored one by more than --import-tolerance. An absolute
+--import-budget-ms (or IMPORT_BUDGET_MS) can be set as well; it is off by
+default because wall-clock import time depends on the machine.
+
+Requires httpx (in backend/requirements.txt) to drive the app in-process.
+--in-memory also needs `pip install mongomock-motor`; otherwise MONGO_URL is used.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from backend_test import AaiSahebAPITester
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+ROUTES = ["auth_otp_flow", "sos_activate", "jobs", "community_posts", "profile"]
+
+
+class CapturingOTPProvider:
+    """OTP provider that hands codes straight to the benchmark instead of an SMS gateway"""
+    name = "capture"
+
+    def __init__(self):
+        self.codes: Dict[str, str] = {}
+        self.events: Dict[str, asyncio.Event] = {}
+
+    async def _capture(self, destination: str, message: str) -> bool:
+        self.codes[destination] = message
+        self.events.setdefault(destination, asyncio.Event()).set()
+        return True
+
+    async def send_sms(self, phone: str, message: str) -> bool:
+        return await self._capture(phone, message)
+
+    async def send_email(self, email: str, message: str) -> bool:
+        return await self._capture(email, message)
+
+    async def wait_for(self, destination: str, timeout: float = 5.0) -> str:
+        event = self.events.setdefault(destination, asyncio.Event())
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+        del self.events[destination]
+        return self.codes.pop(destination)
+
+
+def load_server(mongo_url: Optional[str], db_name: str, in_memory: bool):
+    """Import backend/server.py, pointing it at the requested database"""
+    os.environ["DB_NAME"] = db_name
+    if mongo_url:
+        os.environ["MONGO_URL"] = mongo_url
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    if in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+        server.db = AsyncMongoMockClient()[db_name]
+    return server
+
+
+def measure_import_ms(runs: int) -> float:
+    """Median wall time of `import server` in a fresh interpreter, in milliseconds"""
+    probe = (
+        "import sys, time; sys.path.insert(0, sys.argv[1]); "
+        "started = time.perf_counter(); import server; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "aai_saheb_import_probe")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe, str(BACKEND_DIR)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return round(statistics.median(samples), 1)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class AaiSahebBenchmark(AaiSahebAPITester):
+    def __init__(self, server, requests_per_route: int, concurrency: int, seed: int):
+        super().__init__()
+        self.server = server
+        self.base_url = "in-process"
+        self.requests_per_route = requests_per_route
+        self.concurrency = concurrency
+        self.seed = seed
+        self.run_id = uuid.uuid4().hex[:6]
+        self.otp_provider = CapturingOTPProvider()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.route_stats: Dict[str, Dict[str, Any]] = {}
+
+    async def setup(self):
+        """Start the app, sign a user in and seed listing data"""
+        self.server.otp_provider = self.otp_provider
+        await self.server.startup_event()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.server.app),
+            base_url="http://benchmark/api",
+            timeout=30
+        )
+        self.auth_token = await self.register_and_verify(self.test_user_data["phone"], self.test_user_data["name"])
+        headers = self.auth_headers()
+        await self.client.post("/profile/trusted-contacts", headers=headers, json={
+            "name": "Benchmark Contact", "phone": "+919800000000", "relationship": "sister"
+        })
+
+        now = self.server.datetime.utcnow()
+        jobs = []
+        for i in range(self.seed):
+            job = self.server.JobPosting(
+                title=f"Benchmark job {i}", company="aai Saheb", location="Pune, Maharashtra",
+                description="Seeded by backend_benchmark.py", requirements=["none"],
+                latitude=18.52, longitude=73.85
+            ).dict()
+            job.update(self.server.job_location_fields(job))
+            jobs.append(job)
+        posts = [
+            self.server.CommunityPost(user_id="benchmark", content=f"Benchmark post {i}", created_at=now).dict()
+            for i in range(self.seed)
+        ]
+        if jobs:
+            await self.server.db.job_postings.insert_many(jobs)
+        if posts:
+            await self.server.db.community_posts.insert_many(posts)
+
+    async def teardown(self):
+        if self.client is not None:
+            await self.client.aclose()
+        await self.server.shutdown_event()
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.auth_token}"}
+
+    async def register_and_verify(self, phone: str, name: str) -> str:
+        response = await self.client.post("/auth/register", json={"name": name, "method": "phone", "phone": phone})
+        response.raise_for_status()
+        otp = await self.otp_provider.wait_for(phone)
+        response = await self.client.post("/auth/verify-otp", json={"method": "phone", "phone": phone, "otp": otp})
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("success"):
+            raise RuntimeError(f"OTP verification failed: {data}")
+        return data["token"]
+
+    # Scenarios: each performs one logical request and returns the final response
+    async def scenario_auth_otp_flow(self, i: int):
+        phone = f"+9197{self.run_id}{i:06d}"
+        await self.register_and_verify(phone, f"Benchmark {i}")
+
+    async def scenario_sos_activate(self, i: int):
+        response = await self.client.post("/sos/activate", headers=self.auth_headers(), json={
+            "location": {"latitude": 18.52, "longitude": 73.85, "address": "Benchmark"}
+        })
+        response.raise_for_status()
+
+    async def scenario_jobs(self, i: int):
+        response = await self.client.get("/jobs", headers=self.auth_headers())
+        response.raise_for_status()
+
+    async def scenario_community_posts(self, i: int):
+        response = await self.client.get("/community/posts", headers=self.auth_headers())
+        response.raise_for_status()
+
+    async def scenario_profile(self, i: int):
+        response = await self.client.get("/profile", headers=self.auth_headers())
+        response.raise_for_status()
+
+    async def run_route(self, name: str, scenario: Callable):
+        """Run `requests_per_route` iterations of a scenario at the configured concurrency"""
+        latencies: List[float] = []
+        errors: List[str] = []
+        iterations = iter(range(self.requests_per_route))
+
+        async def worker():
+            for i in iterations:
+                started = time.perf_counter()
+                try:
+                    await scenario(i)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                except Exception as e:
+                    errors.append(str(e))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        stats = {
+            "requests": self.requests_per_route,
+            "errors": len(errors),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0
+        }
+        self.route_stats[name] = stats
+        details = (
+            f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms, "
+            f"{stats['throughput_rps']} req/s, {stats['errors']} errors"
+        )
+        if errors:
+            details += f" (first error: {errors[0]})"
+        self.log_test(f"Benchmark {name}", not errors, details, stats)
+
+    def check_import_time(self, runs: int, budget_ms: Optional[float]):
+        """Record cold-start import time and hold it to the budget, if one is set"""
+        import_ms = measure_import_ms(runs)
+        self.route_stats["import_server"] = {"import_ms": import_ms, "errors": 0}
+        enforced = budget_ms is not None and budget_ms > 0
+        ok = not enforced or import_ms <= budget_ms
+        budget = f" vs budget {budget_ms}ms" if enforced else ""
+        self.log_test("Import time", ok, f"median {import_ms}ms over {runs} runs{budget}")
+        return ok
+
+    def compare_to_baseline(self, baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+        regressions = []
+        for name, stats in self.route_stats.items():
+            reference = baseline.get(name)
+            if not reference or "p95_ms" not in reference or "p95_ms" not in stats:
+                continue
+            budget = reference["p95_ms"] * (1 + tolerance)
+            ok = stats["p95_ms"] <= budget
+            self.log_test(
+                f"Latency budget {name}", ok,
+                f"p95 {stats['p95_ms']}ms vs budget {budget:.2f}ms (baseline {reference['p95_ms']}ms)"
+            )
+            if not ok:
+                regressions.append(name)
+        return regressions
+
+    def compare_import_to_baseline(self, baseline: Dict[str, Dict[str, Any]], tolerance: float) -> bool:
+        """Hold the import time to the baseline's, measured on the same machine"""
+        reference = baseline.get("import_server", {}).get("import_ms")
+        if not reference:
+            return True
+        import_ms = self.route_stats["import_server"]["import_ms"]
+        budget = reference * (1 + tolerance)
+        ok = import_ms <= budget
+        self.log_test("Import time budget", ok, f"median {import_ms}ms vs budget {budget:.1f}ms (baseline {reference}ms)")
+        return ok
+
+    async def run_all_benchmarks(self, routes: List[str]):
+        print("🚀 Starting aai Saheb Endpoint Benchmarks")
+        print(f"⚙️  {self.requests_per_route} requests per route, concurrency {self.concurrency}")
+        print("=" * 60)
+        await self.setup()
+        try:
+            for name in routes:
+                await self.run_route(name, getattr(self, f"scenario_{name}"))
+        finally:
+            await self.teardown()
+        return self.route_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aai Saheb API routes in-process")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients per route")
+    parser.add_argument("--seed", type=int, default=100, help="jobs and posts to seed before measuring")
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=ROUTES)
+    parser.add_argument("--mongo-url", help="MongoDB URL (defaults to MONGO_URL)")
+    parser.add_argument("--db-name", default=f"aai_saheb_benchmark_{uuid.uuid4().hex[:8]}")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MongoDB")
+    parser.add_argument("--baseline", help="baseline JSON to compare p95 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 regression, as a fraction")
+    parser.add_argument("--save-baseline", help="write this run's results as the new baseline")
+    parser.add_argument("--output", help="write detailed results JSON here")
+    parser.add_argument("--import-runs", type=int, default=5, help="fresh interpreters used to time `import server`")
+    parser.add_argument("--import-tolerance", type=float, default=0.5,
+                        help="allowed import time regression against the baseline, as a fraction")
+    parser.add_argument("--import-budget-ms", type=float,
+                        default=float(os.getenv("IMPORT_BUDGET_MS", "0")),
+                        help="also fail when the median import time exceeds this (0, the default, disables)")
+    args = parser.parse_args()
+
+    server = load_server(args.mongo_url, args.db_name, args.in_memory)
+    benchmark = AaiSahebBenchmark(server, args.requests, max(1, args.concurrency), args.seed)
+    import_ok = benchmark.check_import_time(max(1, args.import_runs), args.import_budget_ms)
+    stats = asyncio.run(benchmark.run_all_benchmarks(args.routes))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = benchmark.compare_to_baseline(baseline, args.tolerance)
+        if not benchmark.compare_import_to_baseline(baseline, args.import_tolerance):
+            import_ok = False
+
+    print("\n" + "=" * 60)
+    print("📊 BENCHMARK SUMMARY")
+    print("=" * 60)
+    print(f"{'route':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    for name, route in stats.items():
+        if "p95_ms" not in route:
+            continue
+        print(
+            f"{name:<18}{route['p50_ms']:>10}{route['p95_ms']:>10}{route['p99_ms']:>10}"
+            f"{route['throughput_rps']:>10}{route['errors']:>8}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        print(f"\n💾 Baseline saved to: {args.save_baseline}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"routes": stats, "results": benchmark.test_results}, f, indent=2, ensure_ascii=False, default=str)
+        print(f"💾 Detailed results saved to: {args.output}")
+
+    print(f"{'import server':<18}{stats['import_server']['import_ms']:>10} ms")
+
+    failed = [name for name, route in stats.items() if route["errors"]]
+    if not import_ok:
+        regressions.append("import_server")
+    if regressions:
+        print(f"\n❌ Latency regressions: {', '.join(regressions)}")
+    if failed:
+        print(f"❌ Routes with errors: {', '.join(failed)}")
+    sys.exit(1 if regressions or failed else 0)
+
+
+if __name__ == "__main__":
+    main()